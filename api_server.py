@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Async HTTP API for AI Quiz Generator
+Serves index.html and exposes the transcript -> quiz -> export pipeline as JSON
+endpoints, reusing the same functions as the Streamlit app so both behave alike.
+Connections are handled on the event loop; the blocking pipeline runs on a fixed
+pool of API_WORKERS threads. Each generation holds one of those threads until it
+finishes, so at most API_WORKERS generations run at once and later requests
+wait on the event loop (holding a connection but no thread) for a free worker.
+
+Usage:
+    python api_server.py
+    uvicorn api_server:api --host 0.0.0.0 --port 8000
+"""
+
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from app import (
+    collection_source_id,
+    document_truncated,
+    expand_youtube_collection,
+    extract_video_id,
+    find_saved_quiz,
+    generate_quiz_for_videos,
+    generate_quiz_with_deepseek,
+    get_export_artifact,
+    get_transcript,
+    process_document,
+    save_to_question_bank,
+    search_question_bank,
+    silence_bare_mode_warnings,
+    text_source_id,
+)
+from config import (
+    API_HOST,
+    API_PORT,
+    API_WORKERS,
+    ERROR_MESSAGES,
+    MAX_UPLOAD_BYTES,
+    QUESTION_BANK_REUSE,
+    SALIENCE_FILTER_ENABLED,
+)
+from document_reader import LocalUpload, file_sha256
+from metrics import REGISTRY
+from youtube_sources import parse_collection_url
+
+# Room for the multipart boundaries and headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "index.html")
+
+_executor = ThreadPoolExecutor(max_workers=API_WORKERS, thread_name_prefix="pipeline")
+
+
+async def run_blocking(func, *args):
+    """Run a blocking pipeline function on the shared worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, func, *args)
+
+
+def error_response(message, status_code):
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+async def read_json(request):
+    """Parse the request body as a JSON object, or return None"""
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def quiz_response(quiz_data, **extra):
+    # summary and flashcards keep the shape index.html renders
+    return JSONResponse({"summary": "", "flashcards": [], **extra, "quiz": quiz_data["quiz"]})
+
+
+def parse_flag(value, default):
+    """A boolean option from JSON (true/false) or a form field ("true"/"false", "1"/"0")"""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+async def saved_quiz_response(source_id, reuse, **extra):
+    """The question bank's quiz for a source as a response, like the app's reuse option; None if not reusing or not saved"""
+    if not reuse:
+        return None
+    saved_quiz = await run_blocking(find_saved_quiz, source_id)
+    if saved_quiz is None:
+        return None
+    return quiz_response(saved_quiz, reused=True, saved_at=saved_quiz["created_at"], **extra)
+
+
+async def index(request):
+    return FileResponse(INDEX_PATH)
+
+
+async def health(request):
+    return JSONResponse({"status": "ok"})
+
+
+async def metrics(request):
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+async def transcript(request):
+    """POST {"url": ...} -> {"video_id", "transcript"}"""
+    body = await read_json(request)
+    if body is None or not isinstance(body.get("url"), str) or not body["url"].strip():
+        return error_response("Request body must be JSON with a 'url' field.", 400)
+
+    video_id = extract_video_id(body["url"])
+    if not video_id:
+        return error_response(ERROR_MESSAGES["invalid_url"], 400)
+
+    transcript_text, error = await run_blocking(get_transcript, video_id)
+    if error:
+        return error_response(error, 422)
+    return JSONResponse({"video_id": video_id, "transcript": transcript_text})
+
+
+async def generate(request):
+    """POST {"url": ...} or {"text": ...}, optionally with "condense" and "reuse" -> {"quiz", "summary", "flashcards"}
+
+    A playlist or channel URL gives one quiz covering its videos, with their IDs in "video_ids".
+    With "reuse" (default QUESTION_BANK_REUSE) a source seen before gets its saved quiz, marked "reused".
+    """
+    body = await read_json(request)
+    if body is None:
+        return error_response("Request body must be JSON with a 'url' or 'text' field.", 400)
+    url, text = body.get("url"), body.get("text")
+    if (url is not None and not isinstance(url, str)) or (text is not None and not isinstance(text, str)):
+        return error_response("'url' and 'text' must be strings.", 400)
+    if not (url and url.strip()) and not (text and text.strip()):
+        return error_response("Request body must be JSON with a non-empty 'url' or 'text' field.", 400)
+
+    condense = parse_flag(body.get("condense"), SALIENCE_FILTER_ENABLED)
+    reuse = parse_flag(body.get("reuse"), QUESTION_BANK_REUSE)
+    collection = parse_collection_url(url) if url else None
+    if collection:
+        saved = await saved_quiz_response(collection_source_id(collection), reuse)
+        if saved is not None:
+            return saved
+        video_ids, error = await run_blocking(expand_youtube_collection, collection)
+        if error:
+            return error_response(error, 422)
+        quiz_data, error = await run_blocking(generate_quiz_for_videos, video_ids, condense, None, reuse)
+        if error:
+            return error_response(error, 502)
+        await run_blocking(save_to_question_bank, collection[0], collection_source_id(collection), quiz_data, url)
+        return quiz_response(quiz_data, video_ids=video_ids)
+
+    extra = {}
+    if url:
+        video_id = extract_video_id(url)
+        if not video_id:
+            return error_response(ERROR_MESSAGES["invalid_url"], 400)
+        extra["video_id"] = video_id
+        saved = await saved_quiz_response(video_id, reuse, **extra)
+        if saved is not None:
+            return saved
+        source_text, error = await run_blocking(get_transcript, video_id)
+        if error:
+            return error_response(error, 422)
+        source_type, source_id, title = "video", video_id, url
+    else:
+        source_text = text
+        source_type, source_id, title = "text", text_source_id(source_text), None
+        saved = await saved_quiz_response(source_id, reuse)
+        if saved is not None:
+            return saved
+
+    quiz_data, error = await run_blocking(generate_quiz_with_deepseek, source_text, condense, reuse)
+    if error:
+        return error_response(error, 502)
+    await run_blocking(save_to_question_bank, source_type, source_id, quiz_data, title)
+    return quiz_response(quiz_data, **extra)
+
+
+async def generate_from_document(request):
+    """POST multipart form with a 'file' field (PDF, DOCX or TXT) and optional 'condense' and 'reuse' fields -> {"quiz", ...}
+
+    The form parser spools uploads over 1 MB to a temporary file; process_document checks the size again.
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+        return error_response(f"File is too large. The limit is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.", 413)
+
+    form = await request.form()
+    upload = form.get("file")
+    if upload is None or not hasattr(upload, "filename"):
+        return error_response("Upload a document in the 'file' form field.", 400)
+
+    condense = parse_flag(form.get("condense"), SALIENCE_FILTER_ENABLED)
+    reuse = parse_flag(form.get("reuse"), QUESTION_BANK_REUSE)
+    try:
+        document_id = await run_blocking(file_sha256, upload.file)
+        saved = await saved_quiz_response(document_id, reuse)
+        if saved is not None:
+            return saved
+        document_text, error = await run_blocking(process_document, LocalUpload(upload.file, upload.filename))
+    finally:
+        await upload.close()
+    if error:
+        return error_response(error, 422)
+
+    quiz_data, error = await run_blocking(generate_quiz_with_deepseek, document_text, condense, reuse)
+    if error:
+        return error_response(error, 502)
+    await run_blocking(save_to_question_bank, "document", document_id, quiz_data, upload.filename)
+    return quiz_response(quiz_data, truncated=document_truncated(document_text))
+
+
+async def search_questions(request):
+    """GET ?q=words[&source=video ID or document hash] -> {"results": [...]} from the question bank"""
+    query = request.query_params.get("q", "").strip()
+    if not query:
+        return error_response("Add the words to search for as the 'q' query parameter.", 400)
+
+    results, error = await run_blocking(search_question_bank, query, request.query_params.get("source"))
+    if error:
+        return error_response(error, 500)
+    return JSONResponse({"query": query, "count": len(results), "results": results})
+
+
+async def export_pdf(request):
+    """POST {"quiz": [...]} -> PDF report"""
+    body = await read_json(request)
+    if body is None or not isinstance(body.get("quiz"), list):
+        return error_response("Request body must be JSON with a 'quiz' list.", 400)
+
+    try:
+        pdf_bytes = await run_blocking(get_export_artifact, body, "pdf")
+    except (KeyError, IndexError, TypeError) as e:
+        return error_response(f"{ERROR_MESSAGES['pdf_creation_failed']} ({str(e)})", 400)
+    return Response(
+        pdf_bytes,
+        media_type="application/pdf",
+        headers={"Content-Disposition": 'attachment; filename="quiz_report.pdf"'},
+    )
+
+
+silence_bare_mode_warnings()
+
+api = Starlette(routes=[
+    Route("/", index),
+    Route("/api/health", health),
+    Route("/metrics", metrics),
+    Route("/api/transcript", transcript, methods=["POST"]),
+    Route("/api/generate", generate, methods=["POST"]),
+    Route("/api/generate/document", generate_from_document, methods=["POST"]),
+    Route("/api/export/pdf", export_pdf, methods=["POST"]),
+    Route("/api/questions/search", search_questions),
+])
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    print(f"🚀 Serving AI Quiz Generator API on http://{API_HOST}:{API_PORT}")
+    uvicorn.run(api, host=API_HOST, port=API_PORT)
@@ -1,38 +1,106 @@
 import streamlit as st
 import requests
+import html
 import json
+import functools
+import hashlib
+import logging
 import os
-from youtube_transcript_api import (
-    YouTubeTranscriptApi,
-    TranscriptsDisabled,
-    NoTranscriptFound,
-    VideoUnavailable,
-    CouldNotRetrieveTranscript,
-)
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-import io
+import time
 import re
-from dotenv import load_dotenv
-import PyPDF2
-from docx import Document
-
-# Load environment variables
-load_dotenv()
-
-# Page configuration
-st.set_page_config(
-    page_title="AI Quiz Generator from YouTube Videos",
-    page_icon="🎯",
-    layout="wide",
-    initial_sidebar_state="collapsed"
+import queue
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from config import (
+    DEEPSEEK_API_URL,
+    DEEPSEEK_TEMPERATURE,
+    DEEPSEEK_MAX_TOKENS,
+    API_TIMEOUT,
+    API_CONNECT_TIMEOUT,
+    HTTP_POOL_SIZE,
+    CHUNK_MIN_FRACTION,
+    CHUNK_AVERAGE_FRACTION,
+    CHUNK_CONTEXT_CHARS,
+    MAX_PARALLEL_CHUNKS,
+    STREAMING_ENABLED,
+    QUESTIONS_PER_PAGE,
+    MODEL_CONTEXT_TOKENS,
+    TARGET_OUTPUT_TOKENS,
+    MIN_OUTPUT_TOKENS,
+    CHARS_PER_TOKEN,
+    TOKENS_PER_QUESTION,
+    QUESTIONS_PER_1K_INPUT_TOKENS,
+    SALIENCE_FILTER_ENABLED,
+    SALIENCE_MAX_INPUT_TOKENS,
+    SALIENCE_REDUNDANCY_DECAY,
+    HEDGE_LATENCY_PERCENTILE,
+    HEDGE_DEFAULT_DELAY,
+    MAX_ATTEMPTS_PER_MODEL,
+    BACKOFF_BASE_SECONDS,
+    BACKOFF_MAX_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_SECONDS,
+    GENERATION_DEADLINE,
+    DEDUP_SIMILARITY_THRESHOLD,
+    DEDUP_NUM_PERM,
+    MAX_UPLOAD_BYTES,
+    TEXT_READ_CHUNK_BYTES,
+    MAX_DOCUMENT_PAGES,
+    MAX_DOCUMENT_CHARS,
+    PDF_EXTRACT_WORKERS,
+    PDF_PAGES_PER_TASK,
+    PDF_REPORT_WORKERS,
+    PDF_REPORT_SECTION_QUESTIONS,
+    PDF_REPORT_SPOOL_BYTES,
+    QUIZ_CACHE_DIR,
+    QUIZ_CACHE_MAX_BYTES,
+    QUIZ_CACHE_TTL_SECONDS,
+    EXPORT_CACHE_MAX_BYTES,
+    TRANSCRIPT_DB_PATH,
+    TRANSCRIPT_TTL_SECONDS,
+    TRANSCRIPT_NEGATIVE_TTL_SECONDS,
+    QUESTION_BANK_DB_PATH,
+    QUESTION_BANK_REUSE,
+    QUESTION_BANK_SEARCH_LIMIT,
+    CHUNK_QUESTIONS_TTL_SECONDS,
+    MAX_SAVED_CHUNKS,
+    SINGLE_FLIGHT_LOCK_DIR,
+    SINGLE_FLIGHT_WAIT_SECONDS,
+    YOUTUBE_API_KEY,
+    YOUTUBE_REQUESTS_PER_SECOND,
+    YOUTUBE_REQUEST_BURST,
+    MAX_COLLECTION_VIDEOS,
+    TRANSCRIPT_PREFETCH_WORKERS,
+    MAX_PARALLEL_VIDEOS,
+    LOG_FORMAT,
+    METRICS_FILE,
+    METRICS_FLUSH_SECONDS,
 )
+from quiz_cache import QuizCache
+from single_flight import SingleFlight
+from export_cache import ExportCache, content_hash
+from transcript_store import TranscriptStore
+from question_bank import QuestionBank
+from content_chunks import content_defined_chunks, iter_sentences
+from youtube_sources import TokenBucket, expand_collection, parse_collection_url
+from quiz_parser import QuizStreamParser, is_displayable_question, parse_quiz_content
+from document_reader import extract_docx_text, extract_pdf_text, file_sha256, read_text, upload_size
+from model_scheduler import AttemptResult, ModelScheduler, RETRYABLE_STATUS_CODES, parse_retry_after
+from token_budget import TokenBudget
+from metrics import REGISTRY, configure_logging, log_event, stage, timed_stage
+
+# Heavy dependencies (youtube_transcript_api, ReportLab, PyPDF2, NumPy)
+# are imported on the code paths that use them, so starting a process stays cheap.
+# Environment variables from .env are loaded by config.
+
+# Pipeline diagnostics go through structured logs and metrics rather than print()
+configure_logging(LOG_FORMAT)
+REGISTRY.metrics_file = METRICS_FILE
+REGISTRY.flush_seconds = METRICS_FLUSH_SECONDS
 
 # Custom CSS for better styling
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         text-align: center;
@@ -71,6 +139,14 @@ st.markdown("""
         border-radius: 5px;
         font-weight: bold;
     }
+    .quiz-option {
+        padding: 0.25rem 0.5rem;
+    }
+    .quiz-source {
+        color: #6c757d;
+        font-size: 0.85rem;
+        margin-bottom: 1rem;
+    }
     .export-button {
         background-color: #28a745;
         color: white;
@@ -81,8 +157,233 @@ st.markdown("""
         font-size: 1rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+def silence_bare_mode_warnings():
+    """Quiet Streamlit's missing-ScriptRunContext warnings when app functions run headless"""
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+def configure_page():
+    """Apply page configuration and custom CSS; must run before any other Streamlit call"""
+    # Page configuration
+    st.set_page_config(
+        page_title="AI Quiz Generator from YouTube Videos",
+        page_icon="🎯",
+        layout="wide",
+        initial_sidebar_state="collapsed"
+    )
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+# Prompt sent to the model for each chunk of source text
+QUIZ_PROMPT_TEMPLATE = """Generate as many multiple-choice questions as possible from this text. Create comprehensive coverage of all key topics, concepts, and details mentioned. Aim for maximum questions while maintaining quality.
+
+Text: {text}
+
+Output JSON with as many questions as you can create:
+{{
+  "quiz": [
+    {{"question": "...", "options": ["A", "B", "C", "D"], "answer": "B"}}
+  ]
+}}
+
+Generate as many questions as the content allows - aim for maximum coverage!"""
+
+# Put before the prompt of every chunk after the first, so questions spanning a chunk boundary keep their context
+CHUNK_CONTEXT_TEMPLATE = """Context from the preceding text, for reference only (do not write questions about it alone): {context}
+
+"""
+
+# How much source text goes into each prompt and how many tokens each answer may use
+TOKEN_BUDGET = TokenBudget(
+    context_tokens=MODEL_CONTEXT_TOKENS,
+    max_output_tokens=DEEPSEEK_MAX_TOKENS,
+    min_output_tokens=MIN_OUTPUT_TOKENS,
+    target_output_tokens=TARGET_OUTPUT_TOKENS,
+    chars_per_token=CHARS_PER_TOKEN,
+    tokens_per_question=TOKENS_PER_QUESTION,
+    questions_per_1k_input_tokens=QUESTIONS_PER_1K_INPUT_TOKENS,
+    # Budget for the longest context too, so a chunk with context still fits the model's window
+    prompt_template=CHUNK_CONTEXT_TEMPLATE.format(context=" " * CHUNK_CONTEXT_CHARS) + QUIZ_PROMPT_TEMPLATE,
+)
+
+# Models tried in order until one returns a usable quiz
+MODELS_TO_TRY = ["deepseek-chat", "deepseek-coder", "deepseek-chat-33b", "deepseek-chat-6.7b", "deepseek-chat-1.3b"]
+
+@st.cache_resource
+def get_http_session():
+    """Keep-alive HTTP session with a connection pool shared by every session and rerun"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@st.cache_resource
+def get_model_scheduler():
+    """Model scheduler whose circuit breakers and latency history are shared by every session"""
+    return ModelScheduler(
+        MODELS_TO_TRY,
+        hedge_percentile=HEDGE_LATENCY_PERCENTILE,
+        hedge_default_delay=HEDGE_DEFAULT_DELAY,
+        max_attempts=MAX_ATTEMPTS_PER_MODEL,
+        backoff_base=BACKOFF_BASE_SECONDS,
+        backoff_max=BACKOFF_MAX_SECONDS,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=CIRCUIT_RESET_SECONDS,
+        deadline=GENERATION_DEADLINE,
+    )
+
+@st.cache_resource
+def get_quiz_cache():
+    """Quiz cache shared by every session in this process (and on disk, across processes)"""
+    return QuizCache(QUIZ_CACHE_DIR, QUIZ_CACHE_MAX_BYTES, QUIZ_CACHE_TTL_SECONDS)
+
+def quiz_cache_key(transcript_text):
+    """Cache key covering the source text and everything that shapes the generated quiz"""
+    return QuizCache.make_key(
+        transcript_text,
+        models=MODELS_TO_TRY,
+        prompt_template=QUIZ_PROMPT_TEMPLATE,
+        temperature=DEEPSEEK_TEMPERATURE,
+        token_budget=TOKEN_BUDGET.cache_params(),
+        chunking=(CHUNK_MIN_FRACTION, CHUNK_AVERAGE_FRACTION, CHUNK_CONTEXT_CHARS),
+        dedup_threshold=DEDUP_SIMILARITY_THRESHOLD,
+    )
+
+def chunk_key(chunk_text):
+    """Fingerprint of one chunk and everything that shapes the questions generated from it"""
+    return QuizCache.make_key(
+        chunk_text,
+        scope="chunk",
+        models=MODELS_TO_TRY,
+        prompt_template=QUIZ_PROMPT_TEMPLATE,
+        temperature=DEEPSEEK_TEMPERATURE,
+        token_budget=TOKEN_BUDGET.cache_params(),
+    )
+
+@st.cache_resource
+def get_export_cache():
+    """Built JSON and PDF downloads shared by every session in this process"""
+    return ExportCache(EXPORT_CACHE_MAX_BYTES)
+
+@st.cache_resource
+def get_youtube_client():
+    """YouTube transcript client shared by every session, imported on first use"""
+    from youtube_transcript_api import YouTubeTranscriptApi
+    
+    return YouTubeTranscriptApi()
+
+@st.cache_resource
+def get_single_flight():
+    """Coalesces identical concurrent transcript fetches and generations, across sessions and processes"""
+    return SingleFlight(SINGLE_FLIGHT_LOCK_DIR, SINGLE_FLIGHT_WAIT_SECONDS)
+
+def record_coalesced(work, key):
+    """Count a request that was served by another caller's in-flight work"""
+    REGISTRY.inc("quiz_coalesced_requests_total", work=work)
+    log_event("coalesced", f"🤝 Joined an in-flight {work} instead of starting another", work=work, key=key[:16])
+
+@st.cache_resource
+def get_youtube_rate_limiter():
+    """Token bucket shared by every request this process makes to YouTube"""
+    return TokenBucket(YOUTUBE_REQUESTS_PER_SECOND, YOUTUBE_REQUEST_BURST)
+
+def wait_for_youtube():
+    """Wait for the YouTube rate limit before a request, counting the time spent waiting"""
+    waited = get_youtube_rate_limiter().acquire()
+    if waited:
+        REGISTRY.inc("quiz_youtube_throttle_seconds_total", waited)
+
+@st.cache_resource
+def get_transcript_store():
+    """Transcript store shared by every session in this process"""
+    return TranscriptStore(TRANSCRIPT_DB_PATH, TRANSCRIPT_TTL_SECONDS, TRANSCRIPT_NEGATIVE_TTL_SECONDS)
+
+@st.cache_resource
+def get_question_bank():
+    """Question bank shared by every session in this process (and on disk, across processes)"""
+    return QuestionBank(QUESTION_BANK_DB_PATH, CHUNK_QUESTIONS_TTL_SECONDS, MAX_SAVED_CHUNKS)
+
+def text_source_id(text):
+    """Question bank source ID for pasted text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def collection_source_id(collection):
+    """Question bank source ID for a playlist (its list ID) or channel (its handle, name or ID)"""
+    kind, ref = collection
+    return ref if kind == "playlist" else ref[1]
+
+def save_to_question_bank(source_type, source_id, quiz_data, title=None):
+    """Keep a generated quiz in the question bank; a failing bank must not fail generation"""
+    try:
+        quiz_id = get_question_bank().add_quiz(source_type, source_id, quiz_data['quiz'], content_hash(quiz_data), title)
+    except sqlite3.Error as e:
+        log_event("question_bank_write_failed", f"⚠️ Could not save to the question bank: {str(e)}", logging.WARNING)
+        return
+    if quiz_id is not None:
+        log_event(
+            "question_bank_saved",
+            f"📚 Saved {len(quiz_data['quiz'])} questions to the question bank",
+            source_type=source_type,
+            questions=len(quiz_data['quiz'])
+        )
+
+def find_saved_quiz(source_id):
+    """The latest quiz in the question bank for a source, or None"""
+    try:
+        saved_quiz = get_question_bank().latest_quiz(source_id)
+    except sqlite3.Error as e:
+        log_event("question_bank_read_failed", f"⚠️ Could not read the question bank: {str(e)}", logging.WARNING)
+        return None
+    REGISTRY.inc("quiz_cache_requests_total", cache="question_bank", result="miss" if saved_quiz is None else "hit")
+    return saved_quiz
+
+def question_bank_stats():
+    """Question and quiz counts of the question bank, or None if it cannot be read"""
+    try:
+        return get_question_bank().stats()
+    except sqlite3.Error as e:
+        log_event("question_bank_read_failed", f"⚠️ Could not read the question bank: {str(e)}", logging.WARNING)
+        return None
+
+def find_saved_chunks(chunks):
+    """Keys of the chunks and {key: questions} for those already generated, which are reused as they are"""
+    keys = [chunk_key(chunk) for chunk in chunks]
+    try:
+        saved = get_question_bank().chunk_questions(keys)
+    except sqlite3.Error as e:
+        log_event("question_bank_read_failed", f"⚠️ Could not read the question bank: {str(e)}", logging.WARNING)
+        saved = {}
+    hits = sum(key in saved for key in keys)
+    if hits:
+        REGISTRY.inc("quiz_cache_requests_total", hits, cache="chunk", result="hit")
+    if hits < len(keys):
+        REGISTRY.inc("quiz_cache_requests_total", len(keys) - hits, cache="chunk", result="miss")
+    if hits and len(keys) > 1:
+        log_event(
+            "chunks_reused",
+            f"♻️ Reusing questions for {hits}/{len(keys)} unchanged chunks",
+            reused=hits,
+            chunks=len(keys)
+        )
+    return keys, saved
+
+def save_chunk_questions(key, questions):
+    """Remember the questions generated from one chunk; a failing bank must not fail generation"""
+    try:
+        get_question_bank().add_chunk_questions(key, questions)
+    except sqlite3.Error as e:
+        log_event("question_bank_write_failed", f"⚠️ Could not save to the question bank: {str(e)}", logging.WARNING)
 
+@timed_stage("bank_search")
+def search_question_bank(text, source_id=None):
+    """Saved questions whose text or options contain every word of text; returns (results, error)"""
+    try:
+        return get_question_bank().search(text, QUESTION_BANK_SEARCH_LIMIT, source_id), None
+    except sqlite3.Error as e:
+        return None, f"Question bank search failed: {str(e)}"
+
+@timed_stage("url_parse")
 def extract_video_id(url):
     """Extract YouTube video ID from various URL formats"""
     patterns = [
@@ -96,43 +397,112 @@ def extract_video_id(url):
             return match.group(1)
     return None
 
+@timed_stage("document_extract")
 def process_document(uploaded_file):
-    """Process uploaded document and extract text"""
+    """Process uploaded document and extract text, keeping the first MAX_DOCUMENT_CHARS characters"""
     try:
         file_type = uploaded_file.type
         
+        # Reject oversized files before reading any of them
+        size = upload_size(uploaded_file)
+        if size > MAX_UPLOAD_BYTES:
+            return None, f"File is too large ({size / (1024 * 1024):.1f} MB). The limit is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+        uploaded_file.seek(0)
+        
         if file_type == "application/pdf":
-            # Process PDF
-            pdf_reader = PyPDF2.PdfReader(uploaded_file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip(), None
+            # Process PDF: files on disk are memory-mapped where they are; uploads are spooled
+            # to a temp file only when they have enough pages to fan out to worker processes
+            text = extract_pdf_text(
+                getattr(uploaded_file, "disk_path", None) or uploaded_file,
+                max_pages=MAX_DOCUMENT_PAGES,
+                max_chars=MAX_DOCUMENT_CHARS + 1,
+                workers=PDF_EXTRACT_WORKERS,
+                pages_per_task=PDF_PAGES_PER_TASK
+            )
             
         elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            # Process DOCX
-            doc = Document(uploaded_file)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip(), None
+            # Process DOCX: stream paragraphs and table rows straight out of the archive
+            text = extract_docx_text(uploaded_file, max_chars=MAX_DOCUMENT_CHARS + 1)
             
         elif file_type == "text/plain":
-            # Process TXT
-            text = str(uploaded_file.read(), "utf-8")
-            return text.strip(), None
+            # Process TXT: decode in chunks, stopping at the character limit
+            text = read_text(uploaded_file, max_chars=MAX_DOCUMENT_CHARS + 1, chunk_bytes=TEXT_READ_CHUNK_BYTES)
             
         else:
             return None, f"Unsupported file type: {file_type}. Please upload PDF, DOCX, or TXT files."
+        
+        # One character more than the limit is read so that a cut can be reported
+        text = text.strip()
+        if len(text) > MAX_DOCUMENT_CHARS:
+            text = text[:MAX_DOCUMENT_CHARS]
+            log_event(
+                "document_truncated",
+                f"✂️ Document cut to its first {MAX_DOCUMENT_CHARS} characters",
+                logging.WARNING,
+                chars=MAX_DOCUMENT_CHARS
+            )
+        return text, None
             
     except Exception as e:
         return None, f"Error processing document: {str(e)}"
 
-def get_transcript(video_id):
+def document_truncated(document_text):
+    """Whether process_document cut the document at MAX_DOCUMENT_CHARS"""
+    return len(document_text) >= MAX_DOCUMENT_CHARS
+
+@timed_stage("transcript_fetch")
+def get_transcript(video_id, language='en'):
     """Fetch transcript from YouTube video with robust fallbacks and language handling"""
+    # Serve stored transcripts (and stored failures) without going back to YouTube
+    store = get_transcript_store()
+    stored = read_stored_transcript(store, video_id, language)
+    REGISTRY.inc("quiz_cache_requests_total", cache="transcript", result="miss" if stored is None else "hit")
+    if stored is not None:
+        log_event("transcript_store_hit", f"⚡ Transcript for {video_id} served from store", video_id=video_id)
+        return stored
+    
+    # Concurrent requests for the same video share one fetch
+    fetched = []
+    
+    def fetch():
+        fetched.append(True)
+        return fetch_transcript(store, video_id, language)
+    
+    key = f"transcript:{video_id}:{language}"
+    result = get_single_flight().do(key, fetch, recheck=lambda: read_stored_transcript(store, video_id, language))
+    if not fetched:
+        record_coalesced("transcript fetch", key)
+    return result
+
+def read_stored_transcript(store, video_id, language):
+    """(text, error) from the transcript store, or None if nothing usable is stored"""
+    stored = store.get(video_id, language)
+    if stored is None:
+        return None
+    if stored['error']:
+        return None, stored['error']
+    return stored['text'], None
+
+def fetch_transcript(store, video_id, language):
+    """Fetch a transcript from YouTube and store it (or a permanent failure); returns (text, error)"""
+    from youtube_transcript_api import (
+        TranscriptsDisabled,
+        NoTranscriptFound,
+        VideoUnavailable,
+        CouldNotRetrieveTranscript,
+    )
+    
+    def remember_error(message):
+        store.put_error(video_id, language, message)
+        return None, message
+    
     try:
         # Use the API method that matches your installed version (1.2.2)
-        transcript_list = YouTubeTranscriptApi().list(video_id).find_transcript(['en']).fetch()
+        # list() and fetch() are separate requests to YouTube, so each waits for the rate limit
+        wait_for_youtube()
+        transcript = get_youtube_client().list(video_id).find_transcript([language])
+        wait_for_youtube()
+        transcript_list = transcript.fetch()
         
         # Join pieces, skipping empty and noise tokens
         text_chunks = [
@@ -142,23 +512,122 @@ def get_transcript(video_id):
         ]
         transcript_text = " ".join(text_chunks)
         if not transcript_text:
-            raise NoTranscriptFound("Transcript fetched but empty after cleaning.")
+            return remember_error("No transcript found: Transcript fetched but empty after cleaning.")
 
+        segments = [
+            {"text": e.text, "start": e.start, "duration": e.duration}
+            for e in transcript_list
+        ]
+        store.put_transcript(video_id, language, segments, transcript_text)
         return transcript_text, None
 
     except TranscriptsDisabled:
-        return None, "Captions are disabled for this video."
+        return remember_error("Captions are disabled for this video.")
     except VideoUnavailable:
-        return None, "The video is unavailable."
+        return remember_error("The video is unavailable.")
     except NoTranscriptFound as e:
-        return None, f"No transcript found: {str(e)}"
+        return remember_error(f"No transcript found: {str(e)}")
     except CouldNotRetrieveTranscript as e:
+        # Not stored: this covers transient failures such as rate limiting and IP blocks
         return None, f"Could not retrieve transcript: {str(e)}"
     except Exception as e:
         return None, f"Unexpected error while fetching transcript: {str(e)}"
 
-def generate_quiz_with_deepseek(transcript_text):
-    """Generate quiz using DeepSeek API"""
+@timed_stage("collection_expand")
+def expand_youtube_collection(collection):
+    """Video IDs of a playlist or channel from parse_collection_url; returns (video_ids, error)"""
+    video_ids, error = expand_collection(
+        collection,
+        get_http_session(),
+        api_key=YOUTUBE_API_KEY,
+        max_videos=MAX_COLLECTION_VIDEOS,
+        before_request=wait_for_youtube
+    )
+    if video_ids:
+        log_event("collection_expanded", f"📺 Found {len(video_ids)} videos", kind=collection[0], videos=len(video_ids))
+    return video_ids, error
+
+def split_text_into_chunks(text, chunk_size=None):
+    """Split text into content-defined chunks of at most chunk_size characters, ending after whole sentences"""
+    chunk_size = chunk_size or TOKEN_BUDGET.chunk_chars()
+    return content_defined_chunks(
+        text,
+        int(chunk_size * CHUNK_MIN_FRACTION),
+        int(chunk_size * CHUNK_AVERAGE_FRACTION),
+        chunk_size,
+    )
+
+def chunk_context(chunks, index):
+    """End of the chunk before chunks[index]: its last sentence, at most CHUNK_CONTEXT_CHARS long
+
+    It only goes into the prompt; chunk_key fingerprints the chunk alone, so an edit to the
+    previous chunk does not stop this one's saved questions from being reused.
+    """
+    if index == 0:
+        return ""
+    sentences = list(iter_sentences(chunks[index - 1], CHUNK_CONTEXT_CHARS))
+    return sentences[-1].strip() if sentences else ""
+
+def chunk_prompt(chunk_text, context=""):
+    """Quiz prompt for one chunk, preceded by the previous chunk's context if there is one"""
+    prompt = QUIZ_PROMPT_TEMPLATE.format(text=chunk_text)
+    return CHUNK_CONTEXT_TEMPLATE.format(context=context) + prompt if context else prompt
+
+def condense_source_text(text):
+    """Keep only the most informative sentences of a long source, within SALIENCE_MAX_INPUT_TOKENS"""
+    from salience import select_salient_sentences
+    
+    condensed = select_salient_sentences(text, SALIENCE_MAX_INPUT_TOKENS, CHARS_PER_TOKEN, SALIENCE_REDUNDANCY_DECAY)
+    if len(condensed) < len(text):
+        log_event(
+            "source_condensed",
+            f"✂️ Condensed source from ~{TOKEN_BUDGET.estimate(text)} to ~{TOKEN_BUDGET.estimate(condensed)} tokens",
+            chars_before=len(text),
+            chars_after=len(condensed)
+        )
+    return condensed
+
+def new_question_deduplicator():
+    """Near-duplicate filter configured from config.py"""
+    from question_dedup import QuestionDeduplicator
+    
+    return QuestionDeduplicator(DEDUP_SIMILARITY_THRESHOLD, DEDUP_NUM_PERM)
+
+def merge_quiz_results(results):
+    """Merge per-chunk quiz results into one quiz, dropping near-duplicate questions"""
+    merged = []
+    deduplicator = new_question_deduplicator()
+    duplicates = 0
+    errors = []
+    
+    for parsed_result, error in results:
+        if error:
+            errors.append(error)
+            continue
+        for question_data in parsed_result.get('quiz', []):
+            if deduplicator.add(question_data):
+                merged.append(question_data)
+            else:
+                duplicates += 1
+    
+    if not merged:
+        return None, errors[0] if errors else "❌ The model did not return any questions."
+    
+    if duplicates:
+        log_event("duplicates_removed", f"🧹 Removed {duplicates} near-duplicate questions", removed=duplicates)
+    if errors:
+        log_event(
+            "chunks_failed",
+            f"⚠️ {len(errors)}/{len(results)} chunks failed; returning questions from the rest",
+            logging.WARNING,
+            failed=len(errors),
+            chunks=len(results)
+        )
+    
+    return {"quiz": merged}, None
+
+def get_api_key():
+    """Return the DeepSeek API key, or an error if it is missing or still a placeholder"""
     api_key = os.getenv('DEEPSEEK_API_KEY')
     if not api_key:
         return None, "DeepSeek API key not found. Please set DEEPSEEK_API_KEY environment variable."
@@ -167,158 +636,493 @@ def generate_quiz_with_deepseek(transcript_text):
     if api_key in ["XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX", "your_actual_deepseek_api_key_here", "your_deepseek_api_key_here"]:
         return None, "❌ Invalid API key detected. Please replace the placeholder in your .env file with a real DeepSeek API key from https://platform.deepseek.com/"
     
-    url = "https://api.deepseek.com/v1/chat/completions"
-    
-    prompt = f"""Generate as many multiple-choice questions as possible from this text. Create comprehensive coverage of all key topics, concepts, and details mentioned. Aim for maximum questions while maintaining quality.
+    return api_key, None
 
-Text: {transcript_text[:4000]}
+def store_in_quiz_cache(cache, cache_key, parsed_result):
+    """Write a generated quiz to the cache; a full or read-only disk must not fail generation"""
+    try:
+        cache.set(cache_key, parsed_result)
+    except OSError as e:
+        log_event("quiz_cache_write_failed", f"⚠️ Could not write quiz cache: {str(e)}", logging.WARNING)
 
-Output JSON with as many questions as you can create:
-{{
-  "quiz": [
-    {{"question": "...", "options": ["A", "B", "C", "D"], "answer": "B"}}
-  ]
-}}
+def cached_quiz(cache, cache_key):
+    """(quiz, None) from the quiz cache, or None on a miss; not counted, as lookup_quiz_cache already counted this key"""
+    cached_result = cache.get(cache_key, count=False)
+    return None if cached_result is None else (cached_result, None)
 
-Generate as many questions as the content allows - aim for maximum coverage!"""
+def lookup_quiz_cache(cache, cache_key):
+    """Read the quiz cache, counting the hit or miss"""
+    cached_result = cache.get(cache_key)
+    REGISTRY.inc("quiz_cache_requests_total", cache="quiz", result="miss" if cached_result is None else "hit")
+    if cached_result is not None:
+        log_event("quiz_cache_hit", "⚡ Quiz served from cache", questions=len(cached_result['quiz']))
+    return cached_result
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+@timed_stage("generate")
+def generate_quiz_with_deepseek(transcript_text, condense=SALIENCE_FILTER_ENABLED, reuse=True):
+    """Generate quiz using DeepSeek API, covering the full text (or its condensed form) in chunks
+    
+    With reuse=False nothing is served from the quiz cache or the saved chunk questions; the new
+    questions replace them.
+    """
+    api_key, key_error = get_api_key()
+    if key_error:
+        return None, key_error
+    
+    if condense:
+        transcript_text = condense_source_text(transcript_text)
+    
+    # Serve repeat requests for the same source straight from the cache
+    cache = get_quiz_cache()
+    cache_key = quiz_cache_key(transcript_text)
+    cached_result = lookup_quiz_cache(cache, cache_key) if reuse else None
+    if cached_result is not None:
+        return cached_result, None
+    
+    # Identical concurrent requests (a class opening the same link) share one generation
+    generated = []
+    
+    def generate():
+        generated.append(True)
+        return generate_and_cache_quiz(transcript_text, api_key, cache, cache_key, reuse)
+    
+    if reuse:
+        result = get_single_flight().do(cache_key, generate, recheck=lambda: cached_quiz(cache, cache_key))
+    else:
+        # Fresh generations only share work with each other, never with the cache
+        result = get_single_flight().do(f"{cache_key}-fresh", generate)
+    if not generated:
+        record_coalesced("quiz generation", cache_key)
+    return result
+
+def generate_and_cache_quiz(transcript_text, api_key, cache, cache_key, reuse=True):
+    """Generate a quiz for every new chunk of the text, merge them with the saved ones and cache the result"""
+    chunks = split_text_into_chunks(transcript_text) or [transcript_text.strip()]
+    keys, saved = find_saved_chunks(chunks) if reuse else ([chunk_key(chunk) for chunk in chunks], {})
+    results = [({"quiz": saved[key]}, None) if key in saved else None for key in keys]
+    pending = [index for index, key in enumerate(keys) if key not in saved]
     
-    # Try different model names if one fails
-    models_to_try = ["deepseek-chat", "deepseek-coder", "deepseek-chat-33b", "deepseek-chat-6.7b", "deepseek-chat-1.3b"]
+    def generate_chunk(index):
+        parsed_result, error = generate_quiz_for_chunk(chunks[index], api_key, chunk_context(chunks, index))
+        if not error and parsed_result['quiz']:
+            save_chunk_questions(keys[index], parsed_result['quiz'])
+        return parsed_result, error
     
-    for i, model_name in enumerate(models_to_try):
-        print(f"🔄 Trying model {i+1}/{len(models_to_try)}: {model_name}")
+    if len(chunks) > 1:
+        log_event(
+            "chunked",
+            f"📚 Splitting text into {len(chunks)} chunks ({MAX_PARALLEL_CHUNKS} in parallel)",
+            chunks=len(chunks),
+            parallel=MAX_PARALLEL_CHUNKS
+        )
+    if pending:
+        # Map: generate a quiz for every changed chunk concurrently; reduce: merge all chunks in source order
+        with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_CHUNKS, len(pending))) as executor:
+            for index, result in zip(pending, executor.map(generate_chunk, pending)):
+                results[index] = result
+    parsed_result, error = merge_quiz_results(results)
+    
+    if not error:
+        REGISTRY.inc("quiz_questions_total", len(parsed_result['quiz']))
+        store_in_quiz_cache(cache, cache_key, parsed_result)
+    
+    return parsed_result, error
+
+@timed_stage("generate_stream")
+def stream_quiz_with_deepseek(transcript_text, on_question, condense=SALIENCE_FILTER_ENABLED, reuse=True):
+    """Generate quiz with streaming responses, calling on_question(number, question_data) as each question completes"""
+    api_key, key_error = get_api_key()
+    if key_error:
+        return None, key_error
+    
+    if condense:
+        transcript_text = condense_source_text(transcript_text)
+    
+    cache = get_quiz_cache()
+    cache_key = quiz_cache_key(transcript_text)
+    cached_result = lookup_quiz_cache(cache, cache_key) if reuse else None
+    if cached_result is not None:
+        for number, question_data in enumerate(cached_result['quiz'], 1):
+            on_question(number, question_data)
+        return cached_result, None
+    
+    # Callers that join another caller's generation get its questions once it finishes
+    streamed = []
+    
+    def generate():
+        streamed.append(True)
+        return stream_and_cache_quiz(transcript_text, on_question, api_key, cache, cache_key, reuse)
+    
+    if reuse:
+        parsed_result, error = get_single_flight().do(cache_key, generate, recheck=lambda: cached_quiz(cache, cache_key))
+    else:
+        parsed_result, error = get_single_flight().do(f"{cache_key}-fresh", generate)
+    if not streamed:
+        record_coalesced("quiz generation", cache_key)
+        if not error:
+            for number, question_data in enumerate(parsed_result['quiz'], 1):
+                on_question(number, question_data)
+    return parsed_result, error
+
+def stream_and_cache_quiz(transcript_text, on_question, api_key, cache, cache_key, reuse=True):
+    """Stream quizzes for every new chunk of the text after the saved ones, emitting new questions in order, and cache the result"""
+    chunks = split_text_into_chunks(transcript_text) or [transcript_text.strip()]
+    keys, saved = find_saved_chunks(chunks) if reuse else ([chunk_key(chunk) for chunk in chunks], {})
+    question_queue = queue.Queue()
+    quiz = []
+    deduplicator = new_question_deduplicator()
+    
+    # Questions of unchanged chunks are shown straight away
+    for key in keys:
+        for question_data in saved.get(key, []):
+            question_queue.put(question_data)
+    
+    def stream_chunk(index):
+        chunk_questions = []
         
-        data = {
-            "model": model_name,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.7,
-            "max_tokens": 4000
-        }
+        def emit(question_data):
+            chunk_questions.append(question_data)
+            question_queue.put(question_data)
+        
+        error = stream_quiz_for_chunk(chunks[index], api_key, emit, chunk_context(chunks, index))
+        if not error and chunk_questions:
+            save_chunk_questions(keys[index], chunk_questions)
+        return error
     
-        try:
-            # Use timeout from config
-            from config import API_TIMEOUT
-            response = requests.post(url, headers=headers, json=data, timeout=API_TIMEOUT)
-            
-            # Debug: Log response details
-            if response.status_code != 200:
-                error_detail = f"Status: {response.status_code}, Response: {response.text[:500]}"
-                print(f"❌ Model {model_name} failed: {error_detail}")
-                
-                # Provide specific error messages for common issues
-                if response.status_code == 401:
-                    print("🔑 Authentication failed - check your API key")
-                    return None, f"❌ API authentication failed with model {model_name}. Please verify your DeepSeek API key is correct and active."
-                elif response.status_code == 429:
-                    print("⏰ Rate limit exceeded")
-                    continue  # Try next model
-                elif response.status_code == 400:
-                    print("📝 Bad request - model may not exist")
-                    continue  # Try next model
-                else:
-                    continue  # Try next model
-            
-            response.raise_for_status()
+    pending = [index for index, key in enumerate(keys) if key not in saved]
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_PARALLEL_CHUNKS, len(pending)))) as executor:
+        futures = [executor.submit(stream_chunk, index) for index in pending]
+        
+        # Hand questions to on_question from this thread: Streamlit calls must not come from workers
+        while True:
+            try:
+                question_data = question_queue.get(timeout=0.1)
+            except queue.Empty:
+                if all(future.done() for future in futures) and question_queue.empty():
+                    break
+                continue
             
-            result = response.json()
-            content = result['choices'][0]['message']['content']
+            if not deduplicator.add(question_data):
+                continue
+            quiz.append(question_data)
+            on_question(len(quiz), question_data)
+        
+        errors = [error for error in (future.result() for future in futures) if error]
+    
+    if not quiz:
+        return None, errors[0] if errors else "❌ The model did not return any questions."
+    
+    if errors:
+        log_event(
+            "chunks_failed",
+            f"⚠️ {len(errors)}/{len(chunks)} chunks failed; returning questions from the rest",
+            logging.WARNING,
+            failed=len(errors),
+            chunks=len(chunks)
+        )
+    
+    REGISTRY.inc("quiz_questions_total", len(quiz))
+    parsed_result = {"quiz": quiz}
+    store_in_quiz_cache(cache, cache_key, parsed_result)
+    return parsed_result, None
+
+@timed_stage("generate_collection")
+def generate_quiz_for_videos(video_ids, condense=SALIENCE_FILTER_ENABLED, on_progress=None, reuse=True):
+    """Generate one quiz covering several videos, starting each video's quiz as soon as its transcript arrives
+    
+    Transcripts are fetched TRANSCRIPT_PREFETCH_WORKERS at a time under the YouTube rate limit while
+    earlier videos are already being generated. on_progress(done, total, video_id, error) is called
+    from this thread whenever a video finishes. reuse is passed on to generate_quiz_with_deepseek.
+    """
+    if not video_ids:
+        return None, "No videos to generate a quiz from."
+    
+    events = queue.Queue()
+    results = {}
+    
+    def report(step, video_id, future):
+        try:
+            outcome = future.result()
+        except Exception as e:
+            outcome = (None, f"Unexpected error: {str(e)}")
+        events.put((step, video_id, outcome))
+    
+    with ThreadPoolExecutor(max_workers=TRANSCRIPT_PREFETCH_WORKERS) as fetch_pool, \
+            ThreadPoolExecutor(max_workers=MAX_PARALLEL_VIDEOS) as generate_pool:
+        for video_id in video_ids:
+            fetch_pool.submit(get_transcript, video_id).add_done_callback(functools.partial(report, "transcript", video_id))
+        
+        # Workers only post events; generation is scheduled and progress reported from this thread
+        while len(results) < len(video_ids):
+            step, video_id, (result, error) = events.get()
+            if step == "transcript" and not error:
+                future = generate_pool.submit(generate_quiz_with_deepseek, result, condense, reuse)
+                future.add_done_callback(functools.partial(report, "quiz", video_id))
+                continue
+            results[video_id] = (result, error)
+            if on_progress is not None:
+                on_progress(len(results), len(video_ids), video_id, error)
+    
+    failed = [video_id for video_id in video_ids if results[video_id][1]]
+    if len(failed) == len(video_ids):
+        return None, results[video_ids[0]][1]
+    if failed:
+        log_event(
+            "videos_failed",
+            f"⚠️ {len(failed)}/{len(video_ids)} videos failed; returning questions from the rest",
+            logging.WARNING,
+            failed=len(failed),
+            videos=len(video_ids),
+            video_ids=failed
+        )
+    
+    # Questions keep playlist order; ones repeated across videos are dropped
+    return merge_quiz_results([results[video_id] for video_id in video_ids if not results[video_id][1]])
+
+def iter_sse_content(response, usage=None):
+    """Yield the content deltas of a streaming (server-sent events) chat completion, copying any usage into usage"""
+    for line in response.iter_lines():
+        if not line.startswith(b"data:"):
+            continue
+        payload = line[len(b"data:"):].strip()
+        if payload == b"[DONE]":
+            break
+        event = json.loads(payload)
+        if usage is not None and event.get('usage'):
+            usage.update(event['usage'])
+        choices = event.get('choices') or [{}]
+        content = choices[0].get('delta', {}).get('content')
+        if content:
+            yield content
+
+def stream_quiz_for_chunk(chunk_text, api_key, emit, context=""):
+    """Stream a quiz for one chunk, passing each completed question to emit; returns an error or None"""
+    with stage("prompt_build"):
+        prompt = chunk_prompt(chunk_text, context)
+        max_tokens = TOKEN_BUDGET.max_tokens_for(chunk_text)
+    
+    # Streams are not hedged: questions from a second model would interleave with the first
+    outcome = get_model_scheduler().run(
+        lambda model_name: stream_quiz_from_model(model_name, prompt, api_key, emit, max_tokens),
+        hedge=False
+    )
+    if outcome.value is not None:
+        return None
+    return outcome.error or "❌ All DeepSeek models failed to stream a quiz. Please check your API key and try again."
+
+def instrument_attempt(mode):
+    """Decorator recording latency, outcome and a structured log line for each model attempt"""
+    def decorator(attempt_func):
+        @functools.wraps(attempt_func)
+        def wrapper(model_name, *args, **kwargs):
+            started = time.perf_counter()
+            result = attempt_func(model_name, *args, **kwargs)
+            elapsed = time.perf_counter() - started
             
-            # Try to extract JSON from the response
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                parsed_result = json.loads(json_str)
-                print(f"✅ Success with model: {model_name}")
-                return parsed_result, None
+            if result.value is not None:
+                status = "ok"
+            elif result.fatal:
+                status = "fatal"
+            elif result.retryable:
+                status = "retryable_error"
             else:
-                print(f"⚠️ Model {model_name} returned invalid JSON format")
-                continue  # Try next model
+                status = "error"
+            REGISTRY.observe("quiz_llm_attempt_duration_seconds", elapsed, model=model_name, mode=mode, status=status)
+            log_event(
+                "llm_attempt",
+                f"{'✅' if status == 'ok' else '❌'} Model {model_name} {mode} attempt {status} in {elapsed:.2f}s",
+                logging.INFO if status == "ok" else logging.WARNING,
+                model=model_name,
+                mode=mode,
+                status=status,
+                latency_ms=round(elapsed * 1000, 1),
+                error=result.error
+            )
+            return result
+        return wrapper
+    return decorator
+
+@instrument_attempt("stream")
+def stream_quiz_from_model(model_name, prompt, api_key, emit, max_tokens):
+    """Stream one chat completion from model_name, emitting questions as they complete"""
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    data = {
+        "model": model_name,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": DEEPSEEK_TEMPERATURE,
+        "max_tokens": max_tokens,
+        "stream": True,
+        "stream_options": {"include_usage": True}
+    }
+    parser = QuizStreamParser()
+    usage = {}
+    log_event("llm_request", f"🔄 Streaming model: {model_name}", model=model_name, mode="stream", max_tokens=max_tokens)
+    
+    try:
+        with get_http_session().post(DEEPSEEK_API_URL, headers=headers, json=data, timeout=(API_CONNECT_TIMEOUT, API_TIMEOUT), stream=True) as response:
+            if response.status_code != 200:
+                return classify_error_response(model_name, response)
             
-        except requests.exceptions.Timeout:
-            print(f"⏰ Model {model_name} timed out")
-            continue  # Try next model
-        except requests.exceptions.ConnectionError:
-            print(f"🌐 Model {model_name} connection error")
-            continue  # Try next model
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Model {model_name} request error: {str(e)}")
-            continue  # Try next model
-        except json.JSONDecodeError as e:
-            print(f"📝 Model {model_name} JSON decode error: {str(e)}")
-            continue  # Try next model
-        except Exception as e:
-            print(f"❌ Model {model_name} unexpected error: {str(e)}")
-            continue  # Try next model
+            for content in iter_sse_content(response, usage):
+                for question_data in parser.feed(content):
+                    emit(question_data)
+        
+        log_token_usage(model_name, prompt, max_tokens, usage)
+        if parser.questions:
+            log_event("llm_streamed", f"✅ Streamed {len(parser.questions)} questions with model: {model_name}", model=model_name, questions=len(parser.questions))
+            return AttemptResult(value=len(parser.questions))
+        return AttemptResult(error=f"Model {model_name} streamed no usable questions")
+        
+    except Exception as e:
+        if parser.questions:
+            # Questions already shown to the user are kept rather than regenerated by another model
+            return AttemptResult(value=len(parser.questions))
+        return AttemptResult(error=f"Model {model_name} stream error: {str(e)}", retryable=isinstance(e, requests.exceptions.RequestException))
+
+def classify_error_response(model_name, response):
+    """Turn a non-200 API response into an AttemptResult for the model scheduler"""
+    error_detail = f"Status: {response.status_code}, Response: {response.text[:500]}"
+    log_event(
+        "llm_http_error",
+        f"❌ Model {model_name} failed: {error_detail}",
+        logging.WARNING,
+        model=model_name,
+        http_status=response.status_code
+    )
+    
+    # Provide specific error messages for common issues
+    if response.status_code == 401:
+        return AttemptResult(
+            error=f"❌ API authentication failed with model {model_name}. Please verify your DeepSeek API key is correct and active.",
+            fatal=True
+        )
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        return AttemptResult(
+            error=f"Model {model_name} failed: {error_detail}",
+            retryable=True,
+            retry_after=parse_retry_after(response.headers.get('Retry-After'))
+        )
+    return AttemptResult(error=f"Model {model_name} failed: {error_detail}")
+
+def log_token_usage(model_name, prompt, max_tokens, usage):
+    """Count the tokens the API reported in quiz_llm_tokens_total and log them next to the estimated prompt size"""
+    if not usage:
+        return
+    REGISTRY.inc("quiz_llm_tokens_total", usage.get('prompt_tokens') or 0, model=model_name, kind="prompt")
+    REGISTRY.inc("quiz_llm_tokens_total", usage.get('completion_tokens') or 0, model=model_name, kind="completion")
+    log_event(
+        "llm_usage",
+        f"📏 Model {model_name} tokens: prompt {usage.get('prompt_tokens')} (estimated {TOKEN_BUDGET.estimate(prompt)}), "
+        f"completion {usage.get('completion_tokens')} of max_tokens {max_tokens}",
+        model=model_name,
+        prompt_tokens=usage.get('prompt_tokens'),
+        estimated_prompt_tokens=TOKEN_BUDGET.estimate(prompt),
+        completion_tokens=usage.get('completion_tokens'),
+        max_tokens=max_tokens
+    )
+
+@instrument_attempt("request")
+def request_quiz_from_model(model_name, prompt, api_key, temperature, max_tokens, timeout=API_TIMEOUT):
+    """Make one chat-completions request to model_name, waiting at most timeout seconds per read, and return an AttemptResult"""
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    data = {
+        "model": model_name,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+    log_event("llm_request", f"🔄 Trying model: {model_name}", model=model_name, mode="request", max_tokens=max_tokens)
     
-    # If all models failed, try the exact working format from test
     try:
-        print("🔄 Trying fallback format...")
-        fallback_data = {
-            "model": "deepseek-chat",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.9,
-            "max_tokens": 4000
-        }
+        response = get_http_session().post(DEEPSEEK_API_URL, headers=headers, json=data, timeout=(min(API_CONNECT_TIMEOUT, timeout), timeout))
+        if response.status_code != 200:
+            return classify_error_response(model_name, response)
         
-        from config import API_TIMEOUT
-        response = requests.post(url, headers=headers, json=fallback_data, timeout=API_TIMEOUT)
+        result = response.json()
+        choice = result['choices'][0]
+        content = choice['message']['content']
+        log_token_usage(model_name, prompt, max_tokens, result.get('usage'))
         
-        if response.status_code == 200:
-            result = response.json()
-            content = result['choices'][0]['message']['content']
-            
-            # Try to extract JSON from the response
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                parsed_result = json.loads(json_str)
-                print("✅ Fallback succeeded!")
-                return parsed_result, None
+        # Parse the quiz, keeping every complete question if the JSON was cut off or malformed
+        with stage("json_parse") as parse_info:
+            parsed_result, recovered = parse_quiz_content(content)
+            if parsed_result is None:
+                parse_info["status"] = "error"
+            elif recovered is not None:
+                parse_info["status"] = "recovered"
+        if parsed_result is None:
+            return AttemptResult(error=f"Model {model_name} returned no usable questions")
         
-        return None, "❌ All DeepSeek models failed. Please check your API key and try again. If the issue persists, verify your DeepSeek account status and API key permissions."
+        if recovered is not None:
+            reason = "hit max_tokens" if choice.get('finish_reason') == 'length' else "returned malformed JSON"
+            log_event(
+                "llm_output_recovered",
+                f"🩹 Model {model_name} {reason}; recovered {recovered} complete questions",
+                logging.WARNING,
+                model=model_name,
+                finish_reason=choice.get('finish_reason'),
+                recovered=recovered
+            )
+        return AttemptResult(value=parsed_result)
         
+    except requests.exceptions.Timeout:
+        return AttemptResult(error=f"Model {model_name} timed out", retryable=True)
+    except requests.exceptions.ConnectionError:
+        return AttemptResult(error=f"Model {model_name} connection error", retryable=True)
+    except requests.exceptions.RequestException as e:
+        return AttemptResult(error=f"Model {model_name} request error: {str(e)}")
+    except json.JSONDecodeError as e:
+        return AttemptResult(error=f"Model {model_name} JSON decode error: {str(e)}")
     except Exception as e:
-        return None, f"❌ Fallback also failed: {str(e)}"
+        return AttemptResult(error=f"Model {model_name} unexpected error: {str(e)}")
 
+def generate_quiz_for_chunk(chunk_text, api_key, context=""):
+    """Generate quiz for a single chunk of text, hedging across models via the scheduler"""
+    with stage("prompt_build"):
+        prompt = chunk_prompt(chunk_text, context)
+        max_tokens = TOKEN_BUDGET.max_tokens_for(chunk_text)
+    
+    scheduler = get_model_scheduler()
+    deadline = time.monotonic() + scheduler.deadline
+    outcome = scheduler.run(
+        lambda model_name: request_quiz_from_model(model_name, prompt, api_key, DEEPSEEK_TEMPERATURE, max_tokens)
+    )
+    if outcome.value is not None or outcome.fatal:
+        return outcome.value, outcome.error
+    
+    # If all models failed, try the exact working format from test (unless its circuit is open or time is up)
+    remaining = deadline - time.monotonic()
+    if scheduler.breakers[MODELS_TO_TRY[0]].is_open() or remaining <= 0:
+        return None, outcome.error
+    
+    log_event("llm_fallback", "🔄 Trying fallback format...", model=MODELS_TO_TRY[0])
+    fallback = request_quiz_from_model(MODELS_TO_TRY[0], prompt, api_key, 0.9, max_tokens, timeout=min(API_TIMEOUT, remaining))
+    if fallback.value is not None:
+        return fallback.value, None
+    
+    return None, "❌ All DeepSeek models failed. Please check your API key and try again. If the issue persists, verify your DeepSeek account status and API key permissions."
+
+@timed_stage("pdf_render")
 def create_pdf_report(data, filename):
-    """Create PDF report using reportlab"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=1  # Center alignment
+    """Create PDF report using reportlab; returns a file object positioned at the start"""
+    from pdf_report import build_pdf_report
+    
+    return build_pdf_report(
+        data,
+        spool_max_bytes=PDF_REPORT_SPOOL_BYTES,
+        workers=PDF_REPORT_WORKERS,
+        section_questions=PDF_REPORT_SECTION_QUESTIONS,
     )
-    story.append(Paragraph("AI Quiz Generator Report", title_style))
-    story.append(Spacer(1, 20))
-    
-    # Quiz
-    story.append(Paragraph("Quiz Questions", styles['Heading2']))
-    for i, question_data in enumerate(data['quiz'], 1):
-        story.append(Paragraph(f"Question {i}: {question_data['question']}", styles['Normal']))
-        for j, option in enumerate(['A', 'B', 'C', 'D']):
-            option_text = f"{option}. {question_data['options'][j]}"
-            if option == question_data['answer']:
-                option_text += " (Correct Answer)"
-            story.append(Paragraph(option_text, styles['Normal']))
-        story.append(Spacer(1, 10))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
 
 def main():
+    configure_page()
+    
     # Main header
     st.markdown('<h1 class="main-header">🎯 AI Quiz Generator</h1>', unsafe_allow_html=True)
     
@@ -338,6 +1142,24 @@ def main():
             st.success("✅ API key configured")
             st.info(f"🔑 Key length: {len(api_key)} characters")
         
+        cache_stats = get_quiz_cache().stats()
+        st.caption(f"🗄️ Quiz cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['entries']} entries")
+        bank_stats = question_bank_stats()
+        if bank_stats is not None:
+            st.caption(f"📚 Question bank: {bank_stats['questions']} questions from {bank_stats['quizzes']} quizzes")
+        
+        stream_mode = st.checkbox("⚡ Stream questions as they are generated", value=STREAMING_ENABLED)
+        condense = st.checkbox(
+            "✂️ Condense long sources to their key sentences",
+            value=SALIENCE_FILTER_ENABLED,
+            help="Faster and cheaper on long videos and documents, at some cost in coverage"
+        )
+        reuse_saved = st.checkbox(
+            "♻️ Reuse saved quizzes for sources seen before",
+            value=QUESTION_BANK_REUSE,
+            help="Load the question bank's quiz for the same video, playlist or document instead of generating a new one. Unticked, every question is generated afresh."
+        )
+        
         st.markdown("### 🔑 How to get API key:")
         st.markdown("1. Go to [DeepSeek Platform](https://platform.deepseek.com/)")
         st.markdown("2. Sign up/Login to your account")
@@ -353,12 +1175,18 @@ def main():
         st.markdown("1. Choose 'YouTube Video' option")
         st.markdown("2. Paste a YouTube URL")
         st.markdown("3. Click 'Generate Quiz from Video'")
+        st.markdown("Playlist and channel URLs give one quiz covering their videos.")
         
         st.markdown("**From Document:**")
         st.markdown("1. Choose 'Upload Document' option")
         st.markdown("2. Upload PDF, DOCX, or TXT file")
         st.markdown("3. Click 'Generate Quiz from Document'")
         
+        st.markdown("**From the Question Bank:**")
+        st.markdown("1. Choose 'Search Question Bank'")
+        st.markdown("2. Type words from the questions or answers you need")
+        st.markdown("3. Click 'Use these questions' to export them")
+        
         st.markdown("**Export:**")
         st.markdown("4. Download quiz as JSON or PDF")
     
@@ -366,10 +1194,12 @@ def main():
     col1, col2, col3 = st.columns([1, 2, 1])
     
     with col2:
+        streamed_now = False
+        
         # Input method selection
         input_method = st.radio(
             "Choose input method:",
-            ["📺 YouTube Video", "📄 Upload Document"],
+            ["📺 YouTube Video", "📄 Upload Document", "🔎 Search Question Bank"],
             horizontal=True
         )
         
@@ -378,18 +1208,40 @@ def main():
             youtube_url = st.text_input(
                 "📺 Enter YouTube URL:",
                 placeholder="https://www.youtube.com/watch?v=...",
-                help="Paste any YouTube video URL here"
+                help="Paste a YouTube video URL, or a playlist or channel URL for a quiz covering all its videos"
             )
+            collection = parse_collection_url(youtube_url) if youtube_url else None
             
             # Generate button for YouTube
             if st.button("🚀 Generate Quiz from Video", type="primary", use_container_width=True):
                 if not youtube_url:
                     st.error("Please enter a YouTube URL")
+                elif collection:
+                    source_id = collection_source_id(collection)
+                    saved_quiz = find_saved_quiz(source_id) if reuse_saved else None
+                    if saved_quiz:
+                        load_saved_quiz(saved_quiz)
+                    else:
+                        quiz_data, quiz_error = generate_quiz_for_collection_display(collection, condense, reuse_saved)
+                        
+                        if quiz_error:
+                            st.error(f"❌ Failed to generate quiz: {quiz_error}")
+                        else:
+                            st.success("🎉 Quiz generated successfully!")
+                            save_to_question_bank(collection[0], source_id, quiz_data, title=youtube_url)
+                            
+                            # Store data in session state for display and export
+                            st.session_state.quiz_data = quiz_data
+                            st.session_state.quiz_hash = content_hash(quiz_data)
+                            st.session_state.pop('quiz_page', None)
                 else:
                     # Extract video ID
                     video_id = extract_video_id(youtube_url)
+                    saved_quiz = find_saved_quiz(video_id) if video_id and reuse_saved else None
                     if not video_id:
                         st.error("Invalid YouTube URL. Please check the format.")
+                    elif saved_quiz:
+                        load_saved_quiz(saved_quiz)
                     else:
                         # Show loading spinner
                         with st.spinner("🔄 Processing... This may take a few moments."):
@@ -404,32 +1256,29 @@ def main():
                                 transcript_length = len(transcript)
                                 if transcript_length > 15000:  # More than 15k characters
                                     st.warning(f"⚠️ Very long transcript detected ({transcript_length} characters). This may take longer to process.")
-                                    st.info("💡 The AI will generate as many questions as possible from the content.")
+                                    st.info("💡 The full text will be split into chunks and processed in parallel so every part is covered.")
                                 elif transcript_length > 8000:  # More than 8k characters
                                     st.info(f"📝 Long transcript detected ({transcript_length} characters). The AI will generate comprehensive questions covering all topics.")
                                 
                                 st.success(f"✅ Transcript extracted successfully! ({transcript_length} characters)")
                                 
                                 # Generate quiz with progress indicator
-                                with st.spinner("🧠 Generating comprehensive quiz with AI... This may take up to 2 minutes for long content."):
-                                    quiz_data, quiz_error = generate_quiz_with_deepseek(transcript)
+                                quiz_data, quiz_error = generate_quiz_for_display(transcript, stream_mode, condense, reuse_saved)
                                 
                                 if quiz_error:
                                     st.error(f"❌ Failed to generate quiz: {quiz_error}")
                                 else:
                                     st.success("🎉 Quiz generated successfully!")
+                                    save_to_question_bank("video", video_id, quiz_data, title=youtube_url)
                                     
-                                    # Store data in session state for export
+                                    # Store data in session state for display and export
                                     st.session_state.quiz_data = quiz_data
+                                    st.session_state.quiz_hash = content_hash(quiz_data)
                                     st.session_state.transcript = transcript
-                                    
-                                    # Display results
-                                    display_results(quiz_data)
-                                    
-                                    # Export buttons
-                                    display_export_buttons(quiz_data)
+                                    st.session_state.pop('quiz_page', None)
+                                    streamed_now = stream_mode
         
-        else:
+        elif input_method == "📄 Upload Document":
             # Document upload
             uploaded_file = st.file_uploader(
                 "📄 Upload a document",
@@ -439,80 +1288,235 @@ def main():
             
             # Generate button for document
             if uploaded_file and st.button("🚀 Generate Quiz from Document", type="primary", use_container_width=True):
-                # Show loading spinner
-                with st.spinner("🔄 Processing document... This may take a few moments."):
-                    # Process document
-                    document_text, doc_error = process_document(uploaded_file)
-                    
-                    if doc_error:
-                        st.error(f"❌ Failed to process document: {doc_error}")
-                    else:
-                        # Check document length
-                        doc_length = len(document_text)
-                        if doc_length > 15000:  # More than 15k characters
-                            st.warning(f"⚠️ Very long document detected ({doc_length} characters). This may take longer to process.")
-                            st.info("💡 The AI will generate as many questions as possible from the content.")
-                        elif doc_length > 8000:  # More than 8k characters
-                            st.info(f"📝 Long document detected ({doc_length} characters). The AI will generate comprehensive questions covering all topics.")
-                        
-                        st.success(f"✅ Document processed successfully! ({doc_length} characters)")
-                        
-                        # Generate quiz with progress indicator
-                        with st.spinner("🧠 Generating comprehensive quiz with AI... This may take up to 2 minutes for long content."):
-                            quiz_data, quiz_error = generate_quiz_with_deepseek(document_text)
+                # The same file uploaded again is found in the question bank by its hash
+                document_id = file_sha256(uploaded_file)
+                saved_quiz = find_saved_quiz(document_id) if reuse_saved else None
+                if saved_quiz:
+                    load_saved_quiz(saved_quiz)
+                else:
+                    # Show loading spinner
+                    with st.spinner("🔄 Processing document... This may take a few moments."):
+                        # Process document
+                        document_text, doc_error = process_document(uploaded_file)
                         
-                        if quiz_error:
-                            st.error(f"❌ Failed to generate quiz: {quiz_error}")
+                        if doc_error:
+                            st.error(f"❌ Failed to process document: {doc_error}")
                         else:
-                            st.success("🎉 Quiz generated successfully!")
+                            # Check document length
+                            doc_length = len(document_text)
+                            if doc_length > 15000:  # More than 15k characters
+                                st.warning(f"⚠️ Very long document detected ({doc_length} characters). This may take longer to process.")
+                                st.info("💡 The full text will be split into chunks and processed in parallel so every part is covered.")
+                            elif doc_length > 8000:  # More than 8k characters
+                                st.info(f"📝 Long document detected ({doc_length} characters). The AI will generate comprehensive questions covering all topics.")
                             
-                            # Store data in session state for export
-                            st.session_state.quiz_data = quiz_data
-                            st.session_state.document_text = document_text
+                            st.success(f"✅ Document processed successfully! ({doc_length} characters)")
+                            if document_truncated(document_text):
+                                st.warning(f"✂️ This document is longer than {MAX_DOCUMENT_CHARS:,} characters. Only its first {MAX_DOCUMENT_CHARS:,} characters are used for the quiz.")
                             
-                            # Display results
-                            display_results(quiz_data)
+                            # Generate quiz with progress indicator
+                            quiz_data, quiz_error = generate_quiz_for_display(document_text, stream_mode, condense, reuse_saved)
                             
-                            # Export buttons
-                            display_export_buttons(quiz_data)
+                            if quiz_error:
+                                st.error(f"❌ Failed to generate quiz: {quiz_error}")
+                            else:
+                                st.success("🎉 Quiz generated successfully!")
+                                save_to_question_bank("document", document_id, quiz_data, title=uploaded_file.name)
+                                
+                                # Store data in session state for display and export
+                                st.session_state.quiz_data = quiz_data
+                                st.session_state.quiz_hash = content_hash(quiz_data)
+                                st.session_state.document_text = document_text
+                                st.session_state.pop('quiz_page', None)
+                                streamed_now = stream_mode
+        
+        else:
+            # Question bank search
+            query = st.text_input(
+                "🔎 Search saved questions:",
+                placeholder="photosynthesis chlorophyll",
+                help="Finds saved questions whose text or options contain every word you type"
+            )
+            if query:
+                display_bank_search(query)
+        
+        # Results come from session state so paging and downloads keep them on screen across reruns
+        quiz_data = st.session_state.get('quiz_data')
+        if quiz_data:
+            # Questions streamed in this run are already on screen
+            if not streamed_now:
+                display_results(quiz_data)
+            display_export_buttons(quiz_data, st.session_state.quiz_hash)
+
+def generate_quiz_for_display(source_text, stream_mode, condense, reuse):
+    """Generate the quiz, rendering each question as it arrives when streaming"""
+    if not stream_mode:
+        with st.spinner("🧠 Generating comprehensive quiz with AI... This may take up to 2 minutes for long content."):
+            return generate_quiz_with_deepseek(source_text, condense, reuse)
+    
+    st.markdown('<h2 class="section-header">❓ Quiz Questions</h2>', unsafe_allow_html=True)
+    questions_container = st.container()
+    
+    def on_question(number, question_data):
+        with questions_container:
+            display_question(number, question_data)
+    
+    with st.spinner("🧠 Streaming questions from AI... New questions appear as soon as they are written."):
+        return stream_quiz_with_deepseek(source_text, on_question, condense, reuse)
+
+def generate_quiz_for_collection_display(collection, condense, reuse):
+    """Expand a playlist or channel and generate its quiz, showing progress per video"""
+    with st.spinner("📺 Listing the videos..."):
+        video_ids, error = expand_youtube_collection(collection)
+    if error:
+        return None, error
+    
+    st.info(f"📺 Found {len(video_ids)} videos. Quizzes for early videos are generated while later transcripts are fetched.")
+    progress = st.progress(0.0, text=f"0/{len(video_ids)} videos done")
+    failures = []
+    
+    def on_progress(done, total, video_id, video_error):
+        if video_error:
+            failures.append(f"{video_id}: {video_error}")
+        progress.progress(done / total, text=f"{done}/{total} videos done ({len(failures)} failed)")
+    
+    quiz_data, quiz_error = generate_quiz_for_videos(video_ids, condense, on_progress, reuse)
+    if failures and not quiz_error:
+        with st.expander(f"⚠️ {len(failures)} videos were skipped"):
+            st.markdown("\n".join(f"- {failure}" for failure in failures))
+    return quiz_data, quiz_error
+
+def load_saved_quiz(saved_quiz):
+    """Show a quiz from the question bank instead of generating a new one"""
+    saved_on = time.strftime("%Y-%m-%d %H:%M", time.localtime(saved_quiz['created_at']))
+    st.success(f"♻️ Loaded {len(saved_quiz['quiz'])} saved questions for this source, generated {saved_on}.")
+    st.info("💡 Untick 'Reuse saved quizzes' in the sidebar to generate new questions instead. Nothing saved or cached is reused then.")
+    
+    # Store data in session state for display and export
+    quiz_data = {"quiz": saved_quiz['quiz']}
+    st.session_state.quiz_data = quiz_data
+    st.session_state.quiz_hash = content_hash(quiz_data)
+    st.session_state.pop('quiz_page', None)
+
+def display_bank_search(query):
+    """Search the question bank and list the matches, with a button to use them as the quiz"""
+    started = time.perf_counter()
+    results, error = search_question_bank(query)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if error:
+        st.error(f"❌ {error}")
+        return
+    if not results:
+        st.info("No saved questions match your search.")
+        return
+    
+    if st.button(f"📥 Use these {len(results)} questions as the quiz", type="primary", use_container_width=True):
+        quiz_data = {"quiz": [{key: result[key] for key in ("question", "options", "answer")} for result in results]}
+        st.session_state.quiz_data = quiz_data
+        st.session_state.quiz_hash = content_hash(quiz_data)
+        st.session_state.pop('quiz_page', None)
+        st.success(f"✅ {len(results)} questions loaded. They are shown below, ready to export.")
+        return
+    
+    st.caption(f"📚 {len(results)} matching questions found in {elapsed_ms:.0f} ms")
+    results_html = "".join(
+        render_question_html(number, result)
+        + f'<div class="quiz-source">From {html.escape(result["title"] or result["source_id"])}, '
+        + f'{time.strftime("%Y-%m-%d", time.localtime(result["created_at"]))}</div>'
+        for number, result in enumerate(results, 1)
+    )
+    st.markdown(results_html, unsafe_allow_html=True)
+
+def render_question_html(number, question_data):
+    """HTML for a single quiz question with its options"""
+    options = question_data['options']
+    correct_answer = question_data['answer']
+    
+    parts = [f'<div class="question-box"><p><strong>Question {number}:</strong> {html.escape(str(question_data["question"]))}</p>']
+    for j, option in enumerate(['A', 'B', 'C', 'D']):
+        option_text = html.escape(f"{option}. {options[j]}")
+        if option == correct_answer:
+            parts.append(f'<div class="correct-answer">✅ {option_text}</div>')
+        else:
+            parts.append(f'<div class="quiz-option">❌ {option_text}</div>')
+    parts.append('</div>')
+    return "".join(parts)
+
+def display_question(number, question_data):
+    """Display a single quiz question with its options"""
+    st.markdown(render_question_html(number, question_data), unsafe_allow_html=True)
 
 def display_results(data):
-    """Display the generated quiz results"""
+    """Display the generated quiz results, one page of questions per element"""
     
     # Quiz section
     st.markdown('<h2 class="section-header">❓ Quiz Questions</h2>', unsafe_allow_html=True)
     
-    for i, question_data in enumerate(data['quiz'], 1):
-        st.markdown(f'<div class="question-box">', unsafe_allow_html=True)
-        st.markdown(f"**Question {i}:** {question_data['question']}")
-        
-        # Display options
-        options = question_data['options']
-        correct_answer = question_data['answer']
-        
-        for j, option in enumerate(['A', 'B', 'C', 'D']):
-            option_text = f"{option}. {options[j]}"
-            if option == correct_answer:
-                st.markdown(f'<div class="correct-answer">✅ {option_text}</div>', unsafe_allow_html=True)
-            else:
-                st.markdown(f"❌ {option_text}")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+    questions = data['quiz']
+    page_count = max(1, -(-len(questions) // QUESTIONS_PER_PAGE))
+    page = 0
+    if st.session_state.get("quiz_page", 0) >= page_count:
+        st.session_state.quiz_page = 0
+    if page_count > 1:
+        page = st.selectbox(
+            "Page",
+            range(page_count),
+            format_func=lambda p: f"Questions {p * QUESTIONS_PER_PAGE + 1}–{min(len(questions), (p + 1) * QUESTIONS_PER_PAGE)} of {len(questions)}",
+            key="quiz_page"
+        )
+    
+    # One markdown payload per page keeps render time flat however long the quiz is
+    start = page * QUESTIONS_PER_PAGE
+    page_html = "".join(
+        render_question_html(number, question_data)
+        for number, question_data in enumerate(questions[start:start + QUESTIONS_PER_PAGE], start + 1)
+    )
+    st.markdown(page_html, unsafe_allow_html=True)
 
-def display_export_buttons(data):
-    """Display export buttons for the generated content"""
+def build_export_artifact(data, kind):
+    """Serialize quiz data for download: 'json' (complete package), 'quiz_json' or 'pdf'"""
+    if kind == "json":
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    if kind == "quiz_json":
+        return json.dumps({"quiz": data['quiz']}, indent=2, ensure_ascii=False).encode("utf-8")
+    if kind == "pdf":
+        with create_pdf_report(data, "quiz_report.pdf") as report:
+            return report.read()
+    raise ValueError(f"Unknown export format: {kind}")
+
+def get_export_artifact(data, kind, data_hash=None, export_cache=None):
+    """Export artifact for data, built on first request and then served from the export cache"""
+    data_hash = data_hash or content_hash(data)
+    export_cache = export_cache or get_export_cache()
+    return export_cache.get_or_build(f"{data_hash}:{kind}", lambda: build_export_artifact(data, kind))
+
+def display_export_buttons(data, data_hash):
+    """Display export buttons; each artifact is only built when its button is clicked"""
     st.markdown('<h2 class="section-header">📤 Export Results</h2>', unsafe_allow_html=True)
     
+    # Resolved here: the download callables run on a thread without the script context
+    export_cache = get_export_cache()
+    # Checked up front because a failure inside a download callable cannot show the user a message
+    incomplete = sum(not is_displayable_question(question_data) for question_data in data['quiz'])
+    
+    def deferred(kind):
+        def build():
+            try:
+                return get_export_artifact(data, kind, data_hash, export_cache)
+            except Exception as e:
+                log_event("export_failed", f"❌ Failed to build the {kind} export: {str(e)}", logging.ERROR, kind=kind)
+                raise
+        return build
+    
     # Full data export
     st.markdown("**📋 Complete Package:**")
     col1, col2 = st.columns(2)
     
     with col1:
         # JSON export
-        json_str = json.dumps(data, indent=2, ensure_ascii=False)
         st.download_button(
             label="📄 Download Complete JSON",
-            data=json_str,
+            data=deferred("json"),
             file_name="quiz_data.json",
             mime="application/json",
             use_container_width=True,
@@ -520,19 +1524,18 @@ def display_export_buttons(data):
         )
     
     with col2:
-        # PDF export - generate and provide direct download button
-        try:
-            pdf_buffer = create_pdf_report(data, "quiz_report.pdf")
+        # PDF export, rendered only when the button is clicked
+        if incomplete:
+            st.error(f"Failed to create PDF: {incomplete} questions are missing their options or answer.")
+        else:
             st.download_button(
                 label="📊 Download Complete PDF",
-                data=pdf_buffer.getvalue(),
+                data=deferred("pdf"),
                 file_name="quiz_report.pdf",
                 mime="application/pdf",
                 use_container_width=True,
                 key="dl_full_pdf"
             )
-        except Exception as e:
-            st.error(f"Failed to create PDF: {str(e)}")
     
     # Quiz download
     st.markdown("**🎯 Quiz Download:**")
@@ -540,13 +1543,9 @@ def display_export_buttons(data):
     
     with col3:
         # Quiz only export
-        quiz_only = {
-            "quiz": data['quiz']
-        }
-        quiz_json = json.dumps(quiz_only, indent=2, ensure_ascii=False)
         st.download_button(
             label="❓ Download Quiz (JSON)",
-            data=quiz_json,
+            data=deferred("quiz_json"),
             file_name="quiz_questions.json",
             mime="application/json",
             use_container_width=True,
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Headless batch mode for AI Quiz Generator
+Builds quizzes for a list of YouTube URLs and document paths without the
+Streamlit UI, writing one JSON line per source. Playlist and channel URLs are
+expanded to their videos, whose transcripts are fetched ahead of generation.
+The output file doubles as the checkpoint: rerunning the same command skips
+sources that already have a result.
+
+Usage:
+    python batch.py sources.txt --output quiz_bank.jsonl --concurrency 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from app import (
+    document_truncated,
+    expand_youtube_collection,
+    extract_video_id,
+    generate_quiz_with_deepseek,
+    get_transcript,
+    process_document,
+    save_to_question_bank,
+    silence_bare_mode_warnings,
+)
+from config import TRANSCRIPT_PREFETCH_WORKERS
+from document_reader import LocalUpload, file_sha256
+from youtube_sources import parse_collection_url
+
+def read_sources(path):
+    """Read sources from a text file: one URL or file path per line, '#' starts a comment"""
+    sources = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            source = line.strip()
+            if not source or source.startswith("#") or source in seen:
+                continue
+            seen.add(source)
+            sources.append(source)
+    return sources
+
+
+def expand_sources(sources):
+    """Replace playlist and channel URLs with the URLs of their videos"""
+    expanded = []
+    seen = set()
+    for source in sources:
+        urls = [source]
+        collection = parse_collection_url(source)
+        if collection:
+            video_ids, error = expand_youtube_collection(collection)
+            if error:
+                print(f"❌ {source}: {error}")
+                continue
+            print(f"📺 {source}: {len(video_ids)} videos")
+            urls = [f"https://www.youtube.com/watch?v={video_id}" for video_id in video_ids]
+        for url in urls:
+            if url not in seen:
+                seen.add(url)
+                expanded.append(url)
+    return expanded
+
+
+def load_checkpoint(output_path, retry_failed):
+    """Return the sources that already have a result in the output file"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial line left by a crash mid-write
+            if retry_failed and record.get("status") != "ok":
+                continue
+            done.add(record.get("source"))
+    return done
+
+
+def process_source(source, condense=False):
+    """Run one source through the pipeline and return its result record"""
+    started = time.time()
+    record = {"source": source}
+
+    def fail(stage, error):
+        record.update(status="error", stage=stage, error=error, elapsed_seconds=round(time.time() - started, 2))
+        return record
+
+    video_id = extract_video_id(source)
+    if video_id:
+        record["video_id"] = video_id
+        text, error = get_transcript(video_id)
+        if error:
+            return fail("transcript", error)
+        bank_source = ("video", video_id)
+    elif os.path.isfile(source):
+        with open(source, "rb") as f:
+            bank_source = ("document", file_sha256(f))
+            text, error = process_document(LocalUpload(f, source))
+        if error:
+            return fail("document", error)
+        if document_truncated(text):
+            record["truncated"] = True
+    else:
+        return fail("input", "Not a YouTube URL or an existing file.")
+
+    quiz_data, error = generate_quiz_with_deepseek(text, condense)
+    if error:
+        return fail("generation", error)
+    save_to_question_bank(*bank_source, quiz_data, title=source)
+
+    record.update(
+        status="ok",
+        source_chars=len(text),
+        quiz=quiz_data["quiz"],
+        elapsed_seconds=round(time.time() - started, 2),
+    )
+    return record
+
+
+def run_batch(sources, output_path, concurrency, condense=False, prefetch=0):
+    """Process sources with at most `concurrency` in flight, appending results as they finish
+
+    Transcripts of the next `prefetch` videos beyond the submitted window are fetched in the
+    background, so generation of earlier sources overlaps with fetching later ones.
+    """
+    total = len(sources)
+    completed = 0
+    failed = 0
+
+    with open(output_path, "a", encoding="utf-8") as output, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor, \
+            ThreadPoolExecutor(max_workers=TRANSCRIPT_PREFETCH_WORKERS) as prefetcher:
+        source_iter = iter(sources)
+        prefetch_iter = iter(sources)
+        in_flight = {}  # future -> source
+
+        def prefetch_next():
+            # process_source later finds the transcript stored, or joins the fetch still in flight
+            source = next(prefetch_iter, None)
+            video_id = extract_video_id(source) if source is not None else None
+            if video_id:
+                prefetcher.submit(get_transcript, video_id)
+
+        def submit_next():
+            source = next(source_iter, None)
+            if source is not None:
+                in_flight[executor.submit(process_source, source, condense)] = source
+            prefetch_next()
+
+        # Only a bounded window is submitted, so a 10,000-item run does not queue everything up front
+        for _ in range(prefetch):
+            prefetch_next()
+        for _ in range(concurrency * 2):
+            submit_next()
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = in_flight.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    # One broken source (a malformed quiz, a locked database) must not end a long run
+                    record = {"source": source, "status": "error", "stage": "exception", "error": f"{type(e).__name__}: {str(e)}"}
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                os.fsync(output.fileno())
+
+                completed += 1
+                if record["status"] == "ok":
+                    print(f"✅ [{completed}/{total}] {record['source']} ({len(record['quiz'])} questions)")
+                else:
+                    failed += 1
+                    print(f"❌ [{completed}/{total}] {record['source']} ({record['stage']}): {record['error']}")
+                submit_next()
+
+    return completed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate quizzes for many YouTube URLs and documents without the UI.")
+    parser.add_argument("sources", help="Text file with one YouTube URL or document path per line")
+    parser.add_argument("-o", "--output", default="quiz_bank.jsonl", help="JSONL file for results; also used to resume (default: quiz_bank.jsonl)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Sources processed at the same time (default: 4)")
+    parser.add_argument("--retry-failed", action="store_true", help="Process sources again whose previous result was an error")
+    parser.add_argument("--condense", action="store_true", help="Generate from the most informative sentences of long sources only")
+    parser.add_argument("--prefetch", type=int, default=16, help="Video transcripts fetched ahead of generation (default: 16)")
+    args = parser.parse_args()
+    silence_bare_mode_warnings()
+
+    sources = expand_sources(read_sources(args.sources))
+    done = load_checkpoint(args.output, args.retry_failed)
+    pending = [source for source in sources if source not in done]
+
+    print("🎯 AI Quiz Generator - Batch Mode")
+    print("=" * 50)
+    print(f"📋 {len(sources)} sources, {len(sources) - len(pending)} already done, {len(pending)} to process")
+
+    started = time.time()
+    completed, failed = run_batch(pending, args.output, max(1, args.concurrency), args.condense, max(0, args.prefetch))
+
+    print("=" * 50)
+    print(f"🏁 Processed {completed} sources in {time.time() - started:.1f}s ({failed} failed)")
+    print(f"📄 Results written to {args.output}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
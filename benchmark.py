@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Latency and throughput benchmarks for AI Quiz Generator
+Drives generate_quiz_with_deepseek against the local mock DeepSeek server, and
+process_document and create_pdf_report with synthetic inputs, then reports
+p50/p95/p99 latency and throughput as JSON so runs can be compared across commits.
+
+Usage:
+    python benchmark.py --output benchmark_results.json
+    python benchmark.py --quick --compare benchmark_results.json
+"""
+
+import argparse
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from mock_deepseek_server import MockOptions, start_mock_server
+
+WORDS = (
+    "energy system model data network learning process structure history theory "
+    "market policy cell protein climate ocean signal memory language culture "
+    "algorithm function variable equation pressure temperature velocity element"
+).split()
+
+
+@contextmanager
+def quiet():
+    """Hide the app's progress output and pipeline logs while a case is timed"""
+    stdout = sys.stdout
+    pipeline_logger = logging.getLogger("quiz_generator")
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        pipeline_logger.disabled = True
+        try:
+            yield
+        finally:
+            sys.stdout = stdout
+            pipeline_logger.disabled = False
+
+
+def synthetic_text(chars, seed):
+    """Deterministic prose-like text of roughly `chars` characters"""
+    rng = random.Random(seed)
+    sentences = []
+    total = 0
+    while total < chars:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 18))).capitalize() + "."
+        sentences.append(sentence)
+        total += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def synthetic_quiz(question_count):
+    return {"quiz": [
+        {
+            "question": f"Synthetic question {i + 1} about {WORDS[i % len(WORDS)]}?",
+            "options": [f"Option {letter} for question {i + 1}" for letter in "ABCD"],
+            "answer": "ABCD"[i % 4],
+        }
+        for i in range(question_count)
+    ]}
+
+
+def synthetic_pdf(pages):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    for page in range(pages):
+        text = synthetic_text(3000, seed=page)
+        y = 750
+        for start in range(0, len(text), 90):
+            pdf.drawString(40, y, text[start:start + 90])
+            y -= 14
+            if y < 40:
+                break
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def synthetic_docx(pages):
+    """A DOCX of about `pages` pages: seven 400-character paragraphs per page and a 6x4 table every fifth page"""
+    from docx import Document
+
+    document = Document()
+    for page in range(pages):
+        for i in range(7):
+            document.add_paragraph(synthetic_text(400, seed=page * 7 + i))
+        if page % 5 == 4:
+            table = document.add_table(rows=6, cols=4)
+            for r, row in enumerate(table.rows):
+                for c, cell in enumerate(row.cells):
+                    cell.text = f"Page {page + 1} row {r + 1} column {c + 1} {WORDS[(page + r + c) % len(WORDS)]}"
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def legacy_docx_text(data):
+    """The original DOCX extraction: python-docx object model, paragraphs only; kept as a baseline"""
+    from docx import Document
+
+    doc = Document(io.BytesIO(data))
+    text = ""
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\n"
+    return text.strip()
+
+
+def child_peak_memory_mb(setup, statement):
+    """Growth in peak resident memory (MB) from running statement after setup in a fresh interpreter
+
+    Measured in a child process so memory held by C extensions counts too. Reads VmHWM from
+    /proc (ru_maxrss would include this process's peak), so it is None outside Linux.
+    """
+    code = "\n".join([
+        "def peak_kb():",
+        "    return int(next(line.split()[1] for line in open('/proc/self/status') if line.startswith('VmHWM')))",
+        setup,
+        "before = peak_kb()",
+        statement,
+        "print(peak_kb() - before)",
+    ])
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    return round(int(result.stdout) / 1024, 1)
+
+
+def legacy_create_pdf_report(data):
+    """The original create_pdf_report: one Paragraph per line, built into memory; kept as a baseline"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24, spaceAfter=30, alignment=1)
+    story = [Paragraph("AI Quiz Generator Report", title_style), Spacer(1, 20), Paragraph("Quiz Questions", styles['Heading2'])]
+    for i, question_data in enumerate(data['quiz'], 1):
+        story.append(Paragraph(f"Question {i}: {question_data['question']}", styles['Normal']))
+        for j, option in enumerate(['A', 'B', 'C', 'D']):
+            option_text = f"{option}. {question_data['options'][j]}"
+            if option == question_data['answer']:
+                option_text += " (Correct Answer)"
+            story.append(Paragraph(option_text, styles['Normal']))
+        story.append(Spacer(1, 10))
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def measure(func, inputs, concurrency=1):
+    """Call func on every input with the given concurrency; returns the stats for the case"""
+    latencies = []
+    failures = 0
+
+    def timed(item):
+        started = time.perf_counter()
+        ok = func(item)
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with quiet(), ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency, ok in executor.map(timed, inputs):
+            latencies.append(latency)
+            if ok is False:
+                failures += 1
+    wall_seconds = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "count": len(latencies),
+        "failures": failures,
+        "concurrency": concurrency,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        "throughput_per_s": round(len(latencies) / wall_seconds, 3),
+        "wall_seconds": round(wall_seconds, 3),
+    }
+
+
+def run_benchmarks(app, mock_options, scale):
+    """Run every benchmark case and return {case name: stats}"""
+    from document_reader import LocalUpload, extract_docx_text
+
+    run_id = uuid.uuid4().hex[:8]
+    item_ids = itertools.count()
+    results = {}
+
+    def unique_texts(count, chars):
+        # Fresh text for every item keeps every request (and every chunk of it) a cache miss
+        texts = []
+        for _ in range(count):
+            item_id = next(item_ids)
+            texts.append(f"Benchmark {run_id} item {item_id}. {synthetic_text(chars, seed=item_id)}")
+        return texts
+
+    def generate(text):
+        quiz_data, error = app.generate_quiz_with_deepseek(text)
+        return error is None
+
+    def reset_scheduler():
+        app.get_model_scheduler.clear()
+
+    cases = [
+        ("generate_short", lambda: measure(generate, unique_texts(10 * scale, 3000))),
+        ("generate_long", lambda: measure(generate, unique_texts(2 * scale, 40000))),
+        ("generate_concurrent", lambda: measure(generate, unique_texts(20 * scale, 3000), concurrency=10)),
+    ]
+
+    first_question_latencies = []
+
+    def stream(text):
+        started = time.perf_counter()
+        first = []
+
+        def on_question(number, question_data):
+            if not first:
+                first.append(time.perf_counter() - started)
+
+        quiz_data, error = app.stream_quiz_with_deepseek(text, on_question)
+        if first:
+            first_question_latencies.append(first[0])
+        return error is None
+
+    cases.append(("stream_total", lambda: measure(stream, unique_texts(5 * scale, 3000))))
+
+    for name, case in cases:
+        print(f"⏱️  {name}...")
+        reset_scheduler()
+        results[name] = case()
+
+    first_question_latencies.sort()
+    if first_question_latencies:
+        results["stream_first_question"] = {
+            "count": len(first_question_latencies),
+            "p50_ms": round(percentile(first_question_latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(first_question_latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(first_question_latencies, 0.99) * 1000, 2),
+        }
+
+    # A 50-page handout, then the same handout with one sentence edited in the middle
+    print("⏱️  regenerate_edited_document...")
+    reset_scheduler()
+    handout = unique_texts(1, 150000)[0]
+    middle = handout.index(". ", len(handout) // 2) + 2
+    edited = handout[:middle] + f"The teacher added this sentence in revision {run_id}. " + handout[middle:]
+    for name, text in (("generate_document_50_pages", handout), ("regenerate_edited_document", edited)):
+        requests_before = mock_options.requests
+        results[name] = measure(generate, [text])
+        results[name]["model_requests"] = mock_options.requests - requests_before
+
+    # Same workload with faults injected: errors, rate limits and truncated JSON
+    print("⏱️  generate_with_faults...")
+    reset_scheduler()
+    mock_options.error_rate, mock_options.rate_limit_rate, mock_options.truncate_rate = 0.1, 0.1, 0.1
+    results["generate_with_faults"] = measure(generate, unique_texts(10 * scale, 3000))
+    mock_options.error_rate = mock_options.rate_limit_rate = mock_options.truncate_rate = 0.0
+
+    print("⏱️  process_document...")
+    pdf_bytes = synthetic_pdf(50 * scale)
+    docx_bytes = synthetic_docx(500)
+    txt_bytes = synthetic_text(500000 * scale, seed=1).encode("utf-8")
+
+    def process(item):
+        data, filename = item
+        text, error = app.process_document(LocalUpload(io.BytesIO(data), filename))
+        return error is None
+
+    results["process_document_pdf"] = measure(process, [(pdf_bytes, "bench.pdf")] * 3)
+    results["process_document_docx"] = measure(process, [(docx_bytes, "bench.docx")] * 3)
+    results["process_document_txt"] = measure(process, [(txt_bytes, "bench.txt")] * 3)
+
+    # Whole-document DOCX extraction (no character limit) against the original python-docx path
+    print("⏱️  extract_docx_500_pages...")
+    results["extract_docx_500_pages"] = measure(lambda data: bool(extract_docx_text(io.BytesIO(data))), [docx_bytes] * 3)
+    results["extract_docx_500_pages_legacy"] = measure(lambda data: bool(legacy_docx_text(data)), [docx_bytes] * 3)
+    with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as docx_file:
+        docx_file.write(docx_bytes)
+    try:
+        load = f"data = open({docx_file.name!r}, 'rb').read()"
+        results["extract_docx_500_pages"]["peak_memory_mb"] = child_peak_memory_mb(
+            f"import io\nfrom document_reader import extract_docx_text\n{load}", "extract_docx_text(io.BytesIO(data))"
+        )
+        results["extract_docx_500_pages_legacy"]["peak_memory_mb"] = child_peak_memory_mb(
+            f"import io\nfrom benchmark import legacy_docx_text\nimport docx\n{load}", "legacy_docx_text(data)"
+        )
+    finally:
+        os.remove(docx_file.name)
+
+    def render_report(data):
+        with app.create_pdf_report(data, "bench.pdf") as report:
+            return report.read(5) == b"%PDF-"
+
+    print("⏱️  create_pdf_report...")
+    for question_count in (100, 1000 * scale, 5000 * scale):
+        quiz = synthetic_quiz(question_count)
+        results[f"create_pdf_report_{question_count}"] = measure(render_report, [quiz] * 3)
+        results[f"create_pdf_report_legacy_{question_count}"] = measure(
+            lambda data: legacy_create_pdf_report(data) is not None, [quiz] * 3
+        )
+
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    print("\n" + "=" * 86)
+    print(f"{'case':<28}{'count':>7}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'ops/s':>10}{'Δp50':>8}")
+    print("=" * 86)
+    for name, stats in results.items():
+        delta = ""
+        previous = (baseline or {}).get(name)
+        if previous and previous.get("p50_ms"):
+            delta = f"{(stats['p50_ms'] - previous['p50_ms']) / previous['p50_ms'] * 100:+.0f}%"
+        throughput = stats.get("throughput_per_s", "")
+        print(f"{name:<28}{stats['count']:>7}{stats['p50_ms']:>11}{stats['p95_ms']:>11}{stats['p99_ms']:>11}{throughput:>10}{delta:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the quiz pipeline against a local mock DeepSeek API.")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to show p50 changes against")
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs and fewer iterations")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock API latency in seconds")
+    args = parser.parse_args()
+
+    mock_options = MockOptions(latency=args.latency, stream_chunk_delay=0.005, seed=42)
+    server, url = start_mock_server(mock_options)
+
+    # Point the app at the mock server and at throwaway caches before it reads its config
+    workdir = tempfile.mkdtemp(prefix="quiz-bench-")
+    os.environ["DEEPSEEK_API_URL"] = url
+    os.environ["DEEPSEEK_API_KEY"] = "sk-benchmark"
+    os.environ["QUIZ_CACHE_DIR"] = os.path.join(workdir, "quizzes")
+    os.environ["TRANSCRIPT_DB_PATH"] = os.path.join(workdir, "transcripts.db")
+    os.environ["QUESTION_BANK_DB_PATH"] = os.path.join(workdir, "question_bank.db")
+    import app
+    app.silence_bare_mode_warnings()
+
+    print("🎯 AI Quiz Generator - Benchmark")
+    print(f"🧪 Mock API at {url} (latency {args.latency}s)")
+    results = run_benchmarks(app, mock_options, scale=1 if args.quick else 2)
+    server.shutdown()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results")
+    print_results(results, baseline)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "mock_latency_seconds": args.latency,
+        "quick": args.quick,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
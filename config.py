@@ -11,11 +11,18 @@ load_dotenv()
 
 # API Configuration
 DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY')
-DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
+DEEPSEEK_API_URL = os.getenv('DEEPSEEK_API_URL', "https://api.deepseek.com/v1/chat/completions")
 DEEPSEEK_MODEL = "deepseek-chat"  # Try alternative: "deepseek-chat" or "deepseek-coder"
 DEEPSEEK_TEMPERATURE = 0.7
-DEEPSEEK_MAX_TOKENS = 4000  # Increased for maximum quiz generation
+DEEPSEEK_MAX_TOKENS = 8000  # Upper bound on max_tokens; each request asks for what its chunk needs
 API_TIMEOUT = 60  # Increased from 30 to 60 seconds for longer transcripts
+API_CONNECT_TIMEOUT = 10  # Seconds allowed to establish a connection; API_TIMEOUT bounds the read
+HTTP_POOL_SIZE = 16  # Keep-alive connections kept open to the API host
+
+# API Server Configuration
+API_HOST = os.getenv('API_HOST', "127.0.0.1")
+API_PORT = int(os.getenv('API_PORT', "8000"))
+API_WORKERS = 16  # Threads running the blocking pipeline; connections beyond this wait on the event loop
 
 # App Configuration
 APP_TITLE = "🎯 AI Quiz Generator from YouTube Videos"
@@ -27,6 +34,91 @@ INITIAL_SIDEBAR_STATE = "collapsed"
 DEFAULT_QUIZ_QUESTIONS = 5
 DEFAULT_OPTIONS_PER_QUESTION = 4
 DEFAULT_FLASHCARDS = 5
+QUESTIONS_PER_PAGE = 25  # Questions rendered per page of results; each page is sent to the browser as one element
+
+# Chunked Generation Settings
+CHUNK_MIN_FRACTION = 0.25  # Shortest content-defined chunk, as a fraction of the token budget's chunk size
+CHUNK_AVERAGE_FRACTION = 0.5  # Average chunk; smaller chunks mean an edited document regenerates less text
+CHUNK_CONTEXT_CHARS = 300  # Tail of the previous chunk given with each chunk as context, so questions spanning a boundary keep it
+MAX_PARALLEL_CHUNKS = 8  # Maximum number of chunk requests in flight at once
+STREAMING_ENABLED = True  # Default for rendering questions as the model streams them
+
+# Token Budget Settings
+MODEL_CONTEXT_TOKENS = 64000  # Context window of the DeepSeek chat models
+TARGET_OUTPUT_TOKENS = 2500  # Output one request should produce; sets how much source text goes into each chunk
+MIN_OUTPUT_TOKENS = 600  # Smallest max_tokens sent, so very short inputs still get a full answer
+CHARS_PER_TOKEN = 3.5  # Characters per token used to estimate token counts of English text
+TOKENS_PER_QUESTION = 90  # Output tokens one question with four options takes in the quiz JSON
+QUESTIONS_PER_1K_INPUT_TOKENS = 4  # Questions the prompt tends to produce per 1,000 tokens of source text
+
+# Salience Filter Settings
+SALIENCE_FILTER_ENABLED = False  # Default for condensing long sources to their most informative sentences
+SALIENCE_MAX_INPUT_TOKENS = 12000  # Source tokens kept when condensing
+SALIENCE_REDUNDANCY_DECAY = 0.5  # Weight left on a term once a kept sentence covers it; lower spreads coverage wider
+
+# Model Scheduling Settings
+HEDGE_LATENCY_PERCENTILE = 0.9  # Hedge with the next model once a call is slower than this percentile of its history
+HEDGE_DEFAULT_DELAY = 20  # Seconds before hedging while a model has no latency history yet
+MAX_ATTEMPTS_PER_MODEL = 3  # Attempts per model for rate limits, timeouts and 5xx errors
+BACKOFF_BASE_SECONDS = 1  # Base of the jittered exponential backoff between attempts
+BACKOFF_MAX_SECONDS = 20  # Longest backoff between attempts when no Retry-After is given
+CIRCUIT_FAILURE_THRESHOLD = 3  # Consecutive failures before a model is skipped
+CIRCUIT_RESET_SECONDS = 60  # Seconds a failing model is skipped before it is probed again
+GENERATION_DEADLINE = 150  # Upper bound in seconds on generating one chunk across all models
+
+# Request Coalescing Settings
+SINGLE_FLIGHT_LOCK_DIR = os.getenv('SINGLE_FLIGHT_LOCK_DIR', os.path.join('.cache', 'locks'))  # Lock files shared by processes generating the same source
+SINGLE_FLIGHT_WAIT_SECONDS = 2 * GENERATION_DEADLINE  # Longest wait for another process's generation before doing it here
+
+# YouTube Collection Settings
+YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')  # Optional YouTube Data API key; lists whole playlists and channels instead of the first ~100 videos
+YOUTUBE_REQUESTS_PER_SECOND = 2  # Sustained rate of requests to YouTube from this process (transcripts and playlist pages)
+YOUTUBE_REQUEST_BURST = 5  # Requests that may go out at once before the rate applies
+MAX_COLLECTION_VIDEOS = 200  # Videos taken from a playlist or channel
+TRANSCRIPT_PREFETCH_WORKERS = 4  # Transcripts of a playlist fetched at the same time
+MAX_PARALLEL_VIDEOS = 2  # Videos of a playlist whose quizzes are generated at the same time
+
+# Deduplication Settings
+DEDUP_SIMILARITY_THRESHOLD = 0.7  # Questions this similar (Jaccard over content words) to a kept one are dropped
+DEDUP_NUM_PERM = 64  # MinHash permutations; more is more accurate but slower
+
+# Document Extraction Settings
+MAX_UPLOAD_BYTES = 100 * 1024 * 1024  # Larger documents are rejected; keep server.maxUploadSize in .streamlit/config.toml in line
+TEXT_READ_CHUNK_BYTES = 64 * 1024  # Bytes of a text upload decoded at a time
+MAX_DOCUMENT_PAGES = 5000  # PDF pages read before extraction stops; a safety bound for scanned PDFs with little text
+MAX_DOCUMENT_CHARS = 2000000  # Characters used from one document (~600 pages); all of them go to the model, so longer documents are cut here and the user is told
+PDF_EXTRACT_WORKERS = min(4, os.cpu_count() or 1)  # Worker processes for extracting large PDFs
+PDF_PAGES_PER_TASK = 16  # Pages handed to a worker process at a time
+
+# PDF Report Settings
+PDF_REPORT_WORKERS = min(4, os.cpu_count() or 1)  # Worker processes rendering sections of large reports
+PDF_REPORT_SECTION_QUESTIONS = 500  # Questions per section rendered by one worker
+PDF_REPORT_SPOOL_BYTES = 8 * 1024 * 1024  # Reports larger than this are spooled to a temporary file instead of memory
+
+# Quiz Cache Settings
+QUIZ_CACHE_DIR = os.getenv('QUIZ_CACHE_DIR', os.path.join('.cache', 'quizzes'))
+QUIZ_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Least recently used quizzes are evicted above this size
+QUIZ_CACHE_TTL_SECONDS = 7 * 24 * 3600  # Cached quizzes expire after a week
+
+# Export Settings
+EXPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Memory kept for built JSON/PDF downloads; least recently used are evicted
+
+# Observability Settings
+LOG_FORMAT = os.getenv('LOG_FORMAT', "json")  # "json" for one JSON object per log line, "text" for plain messages
+METRICS_FILE = os.getenv('METRICS_FILE')  # Optional Prometheus text file, e.g. metrics/quiz-{pid}.prom
+METRICS_FLUSH_SECONDS = 15  # Minimum seconds between rewrites of METRICS_FILE
+
+# Transcript Store Settings
+TRANSCRIPT_DB_PATH = os.getenv('TRANSCRIPT_DB_PATH', os.path.join('.cache', 'transcripts.db'))
+TRANSCRIPT_TTL_SECONDS = 30 * 24 * 3600  # Fetched transcripts are kept for a month
+TRANSCRIPT_NEGATIVE_TTL_SECONDS = 6 * 3600  # Failures such as disabled captions are retried after 6 hours
+
+# Question Bank Settings
+QUESTION_BANK_DB_PATH = os.getenv('QUESTION_BANK_DB_PATH', os.path.join('data', 'question_bank.db'))  # Every generated quiz, kept until deleted
+QUESTION_BANK_REUSE = True  # Load the saved quiz for a video or document seen before instead of generating a new one
+QUESTION_BANK_SEARCH_LIMIT = 50  # Questions returned by a search
+CHUNK_QUESTIONS_TTL_SECONDS = 90 * 24 * 3600  # Questions saved per chunk are reused for edited documents for this long
+MAX_SAVED_CHUNKS = 100000  # Oldest saved chunks are deleted above this count
 
 # UI Configuration
 MAIN_HEADER_COLOR = "#1f77b4"
@@ -0,0 +1,66 @@
+"""
+Content-defined chunking
+Splits source text at sentence boundaries chosen by a hash of the sentence
+itself rather than by position, so editing one passage only changes the
+chunks around it: every boundary outside the edit stays where it was and
+the unchanged chunks keep their fingerprints.
+"""
+
+import hashlib
+import re
+
+# Abbreviations whose full stop does not end a sentence
+ABBREVIATIONS = ["Dr", "Mr", "Mrs", "Ms", "Prof", "St", "Jr", "Sr", "vs", "e.g", "i.e", "Fig"]
+NOT_AFTER_ABBREVIATION = "".join(rf"(?<!\b{re.escape(abbreviation)})" for abbreviation in ABBREVIATIONS)
+
+# A sentence ends at ., ! or ? followed by whitespace (so "3.5" and "Dr. Smith" stay whole), or at a
+# line break; the lookahead comes first so the lookbehinds only run at punctuation
+SENTENCE_PATTERN = re.compile(rf'.+?(?:(?=[.!?]){NOT_AFTER_ABBREVIATION}[.!?]+(?=\s)|\n|$)\s*', re.DOTALL)
+
+
+def iter_sentences(text, max_chars):
+    """Sentences of text with their trailing whitespace; ones longer than max_chars are split between words"""
+    for match in SENTENCE_PATTERN.finditer(text):
+        sentence = match.group()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            cut = max_chars if cut <= 0 else cut + 1
+            yield sentence[:cut]
+            sentence = sentence[cut:]
+        if sentence:
+            yield sentence
+
+
+def sentence_fingerprint(sentence):
+    """Stable value in [0, 1) from the sentence's words, ignoring whitespace changes"""
+    digest = hashlib.blake2b(" ".join(sentence.split()).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+def content_defined_chunks(text, min_chars, average_chars, max_chars):
+    """Split text into chunks of min_chars to max_chars (about average_chars) cut after content-chosen sentences
+
+    Past min_chars, a chunk ends after a sentence with probability proportional to the sentence's
+    length, decided by the sentence's own hash, so chunks average about average_chars.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    spread = max(1, average_chars - min_chars)
+    chunks = []
+    current = []
+    length = 0
+    for sentence in iter_sentences(text, max_chars):
+        if current and length + len(sentence) > max_chars:
+            chunks.append("".join(current).strip())
+            current, length = [], 0
+        current.append(sentence)
+        length += len(sentence)
+        if length >= min_chars and sentence_fingerprint(sentence) < len(sentence) / spread:
+            chunks.append("".join(current).strip())
+            current, length = [], 0
+
+    if current:
+        chunks.append("".join(current).strip())
+    return [chunk for chunk in chunks if chunk]
@@ -0,0 +1,259 @@
+"""
+Streaming text extraction for uploaded documents
+PDF pages are yielded in order as they are extracted; large files fan page
+ranges out to a shared process pool so extraction uses every core. PDFs on
+disk are memory-mapped rather than read into memory. DOCX paragraphs and table
+rows are yielded in document order while word/document.xml is parsed
+incrementally, and text files are decoded chunk by chunk, so memory stays flat
+however long the document is.
+"""
+
+import codecs
+import hashlib
+import mmap
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from xml.etree import ElementTree
+
+MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+}
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_BODY, W_P, W_T, W_TAB, W_BR, W_CR = W + "body", W + "p", W + "t", W + "tab", W + "br", W + "cr"
+W_TBL, W_TR, W_TC = W + "tbl", W + "tr", W + "tc"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class LocalUpload:
+    """Wrap an open file so process_document can treat it like a Streamlit upload"""
+
+    def __init__(self, file, path):
+        self._file = file
+        self.name = os.path.basename(path)
+        self.type = MIME_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+        # Set when the file is a regular file on disk, which PDF extraction can then map in place
+        file_name = getattr(file, "name", None)
+        self.disk_path = file_name if isinstance(file_name, str) and os.path.isfile(file_name) else None
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+def get_process_pool(max_workers):
+    """Process pool shared by every extraction in this process, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Forking a process that is running Streamlit's or uvicorn's threads can copy held locks
+            # into the children, so workers are started from a clean forkserver (spawn on Windows)
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def upload_size(file):
+    """Size of an upload in bytes, found without reading it"""
+    size = getattr(file, "size", None)
+    if size is None:
+        position = file.tell()
+        size = file.seek(0, os.SEEK_END)
+        file.seek(position)
+    return size
+
+
+def file_sha256(file, chunk_bytes=1024 * 1024):
+    """SHA-256 of a binary file's contents, read in chunks; the file is left at its start"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(chunk_bytes), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+@contextmanager
+def spooled_to_disk(file, suffix="", chunk_bytes=1024 * 1024):
+    """Copy a binary file to a temporary file chunk by chunk; yields its path and removes it afterwards"""
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as spool:
+        file.seek(0)
+        shutil.copyfileobj(file, spool, chunk_bytes)
+    try:
+        yield spool.name
+    finally:
+        os.remove(spool.name)
+
+
+@contextmanager
+def open_pdf(source):
+    """PdfReader over a PDF path, memory-mapped, or over an open binary file"""
+    import PyPDF2
+
+    # Given a path, PyPDF2 would read the whole file into memory, once in every worker process
+    if not isinstance(source, str):
+        yield PyPDF2.PdfReader(source)
+        return
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield PyPDF2.PdfReader(mapped)
+
+
+def _extract_page_range(path, start, end):
+    """Extract the text of pages [start, end) in a worker process"""
+    with open_pdf(path) as reader:
+        return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def iter_pdf_pages(source, max_pages=None, workers=1, pages_per_task=8):
+    """Yield the text of each page of a PDF (path or binary file), in page order"""
+    with open_pdf(source) as reader:
+        page_count = len(reader.pages)
+        if max_pages is not None:
+            page_count = min(page_count, max_pages)
+
+        # Small documents are not worth the round-trip to worker processes
+        if workers <= 1 or page_count <= pages_per_task * 2:
+            for i in range(page_count):
+                yield reader.pages[i].extract_text() or ""
+            return
+
+    if isinstance(source, str):
+        yield from _iter_pdf_pages_parallel(source, page_count, workers, pages_per_task)
+    else:
+        # Worker processes open the PDF themselves, so an in-memory upload is spooled to disk first
+        with spooled_to_disk(source, suffix=".pdf") as path:
+            yield from _iter_pdf_pages_parallel(path, page_count, workers, pages_per_task)
+
+
+def _iter_pdf_pages_parallel(path, page_count, workers, pages_per_task):
+    pool = get_process_pool(workers)
+    ranges = deque((start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task))
+    in_flight = deque()
+    try:
+        while ranges or in_flight:
+            # Keep a bounded window of ranges in flight so stopping early wastes little work
+            while ranges and len(in_flight) < workers * 2:
+                start, end = ranges.popleft()
+                in_flight.append(pool.submit(_extract_page_range, path, start, end))
+            yield from in_flight.popleft().result()
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def extract_pdf_text(source, max_pages=None, max_chars=None, workers=1, pages_per_task=8):
+    """Extract PDF text page by page, stopping once max_pages or max_chars is reached"""
+    pages = []
+    total_chars = 0
+    page_iter = iter_pdf_pages(source, max_pages=max_pages, workers=workers, pages_per_task=pages_per_task)
+    try:
+        for page_text in page_iter:
+            pages.append(page_text)
+            total_chars += len(page_text) + 1
+            if max_chars is not None and total_chars >= max_chars:
+                break
+    finally:
+        page_iter.close()
+
+    text = "\n".join(pages)
+    if max_chars is not None:
+        text = text[:max_chars]
+    return text
+
+
+def iter_docx_blocks(file):
+    """Yield the text of each paragraph and table row of a DOCX file (path or binary file) in document order
+
+    Cells of a row are joined with " | "; a table nested in a cell becomes part of that cell's text.
+    """
+    with zipfile.ZipFile(file) as archive, archive.open("word/document.xml") as xml:
+        body = None
+        paragraphs = []  # text runs of each open paragraph (text boxes nest paragraphs)
+        cells = []  # paragraph texts of each open table cell
+        rows = []  # cell texts of each open table row
+        for event, element in ElementTree.iterparse(xml, events=("start", "end")):
+            tag = element.tag
+            if event == "start":
+                if tag == W_P:
+                    paragraphs.append([])
+                elif tag == W_TC:
+                    cells.append([])
+                elif tag == W_TR:
+                    rows.append([])
+                elif tag == W_BODY:
+                    body = element
+                continue
+
+            block = None
+            if tag == W_T and paragraphs:
+                paragraphs[-1].append(element.text or "")
+            elif tag == W_TAB and paragraphs:
+                paragraphs[-1].append("\t")
+            elif tag in (W_BR, W_CR) and paragraphs:
+                paragraphs[-1].append("\n")
+            elif tag == W_P:
+                block = "".join(paragraphs.pop())
+            elif tag == W_TC:
+                rows[-1].append(" ".join(text for text in cells.pop() if text.strip()))
+            elif tag == W_TR:
+                block = " | ".join(rows.pop())
+                element.clear()
+
+            if block is not None:
+                if cells:
+                    cells[-1].append(block)
+                else:
+                    yield block
+            if body is not None and not paragraphs and not cells and tag in (W_P, W_TBL):
+                # Drop finished top-level blocks so the parsed tree does not grow with the document
+                del body[:]
+
+
+def extract_docx_text(file, max_chars=None):
+    """Extract DOCX text block by block, stopping once max_chars is reached"""
+    blocks = []
+    total_chars = 0
+    block_iter = iter_docx_blocks(file)
+    try:
+        for block in block_iter:
+            blocks.append(block)
+            total_chars += len(block) + 1
+            if max_chars is not None and total_chars >= max_chars:
+                break
+    finally:
+        block_iter.close()
+
+    text = "\n".join(blocks)
+    if max_chars is not None:
+        text = text[:max_chars]
+    return text
+
+
+def read_text(file, max_chars=None, chunk_bytes=64 * 1024):
+    """Decode a UTF-8 text file chunk by chunk, stopping once max_chars is reached"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parts = []
+    total_chars = 0
+    while max_chars is None or total_chars < max_chars:
+        chunk = file.read(chunk_bytes)
+        # A character split across chunks is held back by the decoder until its last byte arrives
+        text = decoder.decode(chunk, final=not chunk)
+        parts.append(text)
+        total_chars += len(text)
+        if not chunk:
+            break
+
+    text = "".join(parts)
+    if max_chars is not None:
+        text = text[:max_chars]
+    return text
@@ -0,0 +1,68 @@
+"""
+In-memory cache for export artifacts (JSON and PDF downloads)
+Artifacts are keyed by the hash of the quiz content and the export format, built
+the first time someone asks for them, and evicted least-recently-used once
+their total size passes a memory cap.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def content_hash(data):
+    """SHA-256 of the quiz data in canonical JSON form"""
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExportCache:
+    """Size-capped LRU of built artifacts shared by every session in the process"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._building = {}
+
+    def get_or_build(self, key, build):
+        """Return the artifact for key, calling build() to make it (once, even under concurrency) if missing"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        try:
+            with key_lock:
+                with self._lock:
+                    if key in self._entries:
+                        return self._entries[key]
+                artifact = build()
+                self._store(key, artifact)
+        finally:
+            # Also when build() raises, so failed exports do not leave their lock behind
+            with self._lock:
+                self._building.pop(key, None)
+        return artifact
+
+    def _store(self, key, artifact):
+        with self._lock:
+            if len(artifact) > self.max_bytes:
+                # Larger than the whole cache: hand it out without keeping it
+                return
+            self._entries[key] = artifact
+            self._size += len(artifact)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._size}
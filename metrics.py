@@ -0,0 +1,192 @@
+"""
+Pipeline metrics and structured logging
+Counters and latency histograms are kept in-process and rendered in the
+Prometheus text format, served by the HTTP API at /metrics and optionally
+written to a file for node_exporter's textfile collector. Diagnostics are
+logged as one JSON object per line, or as plain messages in text mode.
+"""
+
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+logger = logging.getLogger("quiz_generator")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120)
+
+METRIC_HELP = {
+    "quiz_stage_duration_seconds": ("histogram", "Time spent in each pipeline stage"),
+    "quiz_llm_attempt_duration_seconds": ("histogram", "Latency of each chat-completions attempt by model and outcome"),
+    "quiz_llm_tokens_total": ("counter", "Tokens reported by the API by model and kind"),
+    "quiz_cache_requests_total": ("counter", "Cache lookups by cache and result"),
+    "quiz_questions_total": ("counter", "Questions returned to callers"),
+    "quiz_coalesced_requests_total": ("counter", "Requests served by another caller's in-flight work"),
+    "quiz_youtube_throttle_seconds_total": ("counter", "Time spent waiting for the YouTube rate limit"),
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, event, message and the event's fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": getattr(record, "event", None),
+            "message": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(log_format="json", level=logging.INFO):
+    """Send pipeline logs to stderr as JSON lines ("json") or bare messages ("text")"""
+    formatter = JsonFormatter() if log_format == "json" else logging.Formatter("%(message)s")
+    if not logger.handlers:
+        logger.addHandler(logging.StreamHandler())
+        logger.propagate = False
+    for handler in logger.handlers:
+        handler.setFormatter(formatter)
+    logger.setLevel(level)
+
+
+def log_event(event, message, level=logging.INFO, **fields):
+    """Log a structured event; message stays human-readable, fields become JSON keys"""
+    logger.log(level, message, extra={"event": event, "fields": fields})
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms with labels"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._counters = defaultdict(float)
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.metrics_file = None
+        self.flush_seconds = 15
+        self._last_flush = 0.0
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            self._counters[(name, _label_key(labels))] += amount
+        self.maybe_flush()
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram["counts"][index] += 1
+                    break
+            histogram["sum"] += value
+            histogram["count"] += 1
+        self.maybe_flush()
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: {**value, "counts": list(value["counts"])} for key, value in self._histograms.items()}
+
+        lines = []
+        names = sorted({name for name, _ in counters} | {name for name, _ in histograms})
+        for name in names:
+            kind, help_text = METRIC_HELP.get(name, ("counter" if any(n == name for n, _ in counters) else "histogram", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, label_key), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(label_key)} {value:g}")
+            for (metric, label_key), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram["counts"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(label_key, [('le', f'{bound:g}')])} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(label_key, [('le', '+Inf')])} {histogram['count']}")
+                lines.append(f"{name}_sum{_format_labels(label_key)} {histogram['sum']:.6f}")
+                lines.append(f"{name}_count{_format_labels(label_key)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def maybe_flush(self):
+        """Write the metrics file if one is configured and the flush interval has passed"""
+        if not self.metrics_file:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_flush < self.flush_seconds:
+                return
+            self._last_flush = now
+        self.write_file(self.metrics_file)
+
+    def write_file(self, path):
+        """Atomically write the rendered metrics to path ("{pid}" is replaced by the process id)"""
+        path = path.replace("{pid}", str(os.getpid()))
+        directory = os.path.dirname(os.path.abspath(path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(temp_path, path)
+        except OSError as e:
+            log_event("metrics_write_failed", f"⚠️ Could not write metrics file: {str(e)}", logging.WARNING, path=path)
+
+
+REGISTRY = MetricsRegistry()
+
+
+@contextmanager
+def stage(name, **fields):
+    """Time a pipeline stage; the block may add fields (e.g. status) to the yielded dict"""
+    info = {"status": "ok", **fields}
+    started = time.perf_counter()
+    try:
+        yield info
+    except Exception:
+        info["status"] = "exception"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        REGISTRY.observe("quiz_stage_duration_seconds", elapsed, stage=name, status=info["status"])
+        log_event("stage", f"⏱️ {name} {info['status']} in {elapsed * 1000:.0f} ms",
+                  stage=name, duration_ms=round(elapsed * 1000, 1), **info)
+
+
+def timed_stage(name):
+    """Decorator running a function inside stage(name); a (result, error) return with an error counts as a failure"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name) as info:
+                result = func(*args, **kwargs)
+                if isinstance(result, tuple) and len(result) == 2 and result[1]:
+                    info["status"] = "error"
+                return result
+        return wrapper
+    return decorator
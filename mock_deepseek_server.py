@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the DeepSeek chat-completions endpoint
+Returns synthetic quizzes with configurable latency and fault injection
+(server errors, 429s with Retry-After, truncated JSON) and supports
+stream: true, so the app can be exercised and benchmarked offline.
+
+Usage:
+    python mock_deepseek_server.py --port 8765 --latency 0.5 --rate-limit-rate 0.1
+    DEEPSEEK_API_URL=http://127.0.0.1:8765/v1/chat/completions streamlit run app.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockOptions:
+    """Behaviour of the mock server; every rate is a probability between 0 and 1"""
+
+    def __init__(self, latency=0.2, latency_jitter=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 retry_after=1, truncate_rate=0.0, questions=10, stream_chunk_chars=40,
+                 stream_chunk_delay=0.01, seed=None):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.truncate_rate = truncate_rate
+        self.questions = questions
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stream_chunk_delay = stream_chunk_delay
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def count_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def roll(self, rate):
+        with self.lock:
+            return self.random.random() < rate
+
+    def delay(self):
+        with self.lock:
+            jitter = self.random.uniform(-self.latency_jitter, self.latency_jitter)
+        return max(0.0, self.latency + jitter)
+
+
+def build_quiz_content(prompt, question_count):
+    """Make a quiz whose questions are drawn from the words of the prompt"""
+    words = [word.strip(".,;:!?\"'()") for word in prompt.split() if len(word) > 4] or ["content"]
+    quiz = []
+    for i in range(question_count):
+        word = words[(i * 7) % len(words)]
+        quiz.append({
+            "question": f"What does the text say about '{word}' (point {i + 1})?",
+            "options": [f"{word} option {letter}" for letter in "ABCD"],
+            "answer": "ABCD"[i % 4],
+        })
+    return json.dumps({"quiz": quiz}, indent=2)
+
+
+class MockDeepSeekHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    options = MockOptions()
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        options = self.options
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length))
+            prompt = request["messages"][-1]["content"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            self.send_json(400, {"error": {"message": "Invalid request body"}})
+            return
+        options.count_request()
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self.send_json(401, {"error": {"message": "Authentication Fails"}})
+            return
+        if options.roll(options.rate_limit_rate):
+            self.send_json(429, {"error": {"message": "Rate limit reached"}}, {"Retry-After": str(options.retry_after)})
+            return
+        if options.roll(options.error_rate):
+            self.send_json(500, {"error": {"message": "Internal server error"}})
+            return
+
+        content = build_quiz_content(prompt, options.questions)
+        finish_reason = "stop"
+        if options.roll(options.truncate_rate):
+            # Simulate hitting max_tokens part-way through the JSON
+            content = content[:int(len(content) * options.random.uniform(0.3, 0.9))]
+            finish_reason = "length"
+
+        completion_tokens = len(content) // 4
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": completion_tokens,
+            "total_tokens": len(prompt) // 4 + completion_tokens,
+        }
+
+        if request.get("stream"):
+            self.stream(content, request.get("model"), usage, finish_reason)
+            return
+
+        time.sleep(options.delay())
+        self.send_json(200, {
+            "id": "mock-completion",
+            "object": "chat.completion",
+            "model": request.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+            "usage": usage,
+        })
+
+    def stream(self, content, model, usage, finish_reason):
+        """Send the completion as server-sent events, a few characters at a time"""
+        options = self.options
+        time.sleep(options.delay())
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        step = max(1, options.stream_chunk_chars)
+        for start in range(0, len(content), step):
+            event = {
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start:start + step]}}],
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(options.stream_chunk_delay)
+
+        final = {"object": "chat.completion.chunk", "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}], "usage": usage}
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def start_mock_server(options, host="127.0.0.1", port=0):
+    """Start the mock server on a background thread; returns (server, chat-completions URL)"""
+    handler = type("ConfiguredMockHandler", (MockDeepSeekHandler,), {"options": options})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}/v1/chat/completions"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock of the DeepSeek chat-completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the response (or first stream event)")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Uniform +/- jitter added to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429 responses")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Fraction of completions cut off mid-JSON")
+    parser.add_argument("--questions", type=int, default=10, help="Questions per completion")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    options = MockOptions(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        truncate_rate=args.truncate_rate,
+        questions=args.questions,
+        seed=args.seed,
+    )
+    server, url = start_mock_server(options, args.host, args.port)
+    print(f"🧪 Mock DeepSeek API listening on {url}")
+    print("Press Ctrl+C to stop")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
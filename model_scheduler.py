@@ -0,0 +1,227 @@
+"""
+Request scheduler for trying DeepSeek models
+Hedges a second model when the first is slower than usual, skips models whose
+circuit breaker is open, and retries rate-limited calls after Retry-After with
+jittered exponential backoff, all within a fixed deadline.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+
+from metrics import log_event
+
+# Outcome of a single model attempt:
+# value is the result on success, error a message otherwise; retryable failures may
+# carry the server's Retry-After in seconds, and fatal ones (bad API key) stop all attempts
+AttemptResult = namedtuple(
+    "AttemptResult",
+    ["value", "error", "retryable", "retry_after", "fatal"],
+    defaults=(None, None, False, None, False),
+)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(header_value):
+    """Convert a Retry-After header (seconds or HTTP date) to seconds, or None"""
+    if not header_value:
+        return None
+    try:
+        return max(0.0, float(header_value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(header_value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets a single probe through once the cooldown ends"""
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        with self._lock:
+            return self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self):
+        """Return True if a request may be sent now"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._probing:
+                return False
+            # Half-open: allow one probe request through
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def release_probe(self):
+        """End a half-open probe whose outcome says nothing about the model, e.g. a rejected API key"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class ModelScheduler:
+    """Runs an attempt function against a list of models with hedging, breakers and backoff"""
+
+    def __init__(self, models, hedge_percentile, hedge_default_delay, max_attempts,
+                 backoff_base, backoff_max, failure_threshold, reset_timeout, deadline):
+        self.models = list(models)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_default_delay = hedge_default_delay
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.breakers = {model: CircuitBreaker(failure_threshold, reset_timeout) for model in self.models}
+        self._latencies = {model: deque(maxlen=100) for model in self.models}
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, model):
+        """Seconds to wait on a model before hedging: its latency percentile, once it has enough history"""
+        with self._lock:
+            latencies = sorted(self._latencies[model])
+        if len(latencies) < 5:
+            return self.hedge_default_delay
+        index = min(len(latencies) - 1, int(self.hedge_percentile * len(latencies)))
+        return latencies[index]
+
+    def backoff_delay(self, attempt_number, retry_after=None):
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt_number))
+        if retry_after is not None:
+            # Honour the server's wait, with a little jitter so clients don't retry in lockstep
+            delay = retry_after + random.uniform(0, self.backoff_base)
+        return delay
+
+    def _attempt_with_backoff(self, attempt, model, deadline, cancelled=None):
+        """Try one model up to max_attempts times, stopping early once cancelled is set"""
+        breaker = self.breakers[model]
+        result = AttemptResult(error=f"Model {model} skipped: circuit open")
+
+        for attempt_number in range(self.max_attempts):
+            if cancelled is not None and cancelled.is_set():
+                return result
+            if not breaker.allow():
+                return result
+
+            started = time.monotonic()
+            try:
+                result = attempt(model)
+            except BaseException:
+                breaker.release_probe()
+                raise
+            if result.value is not None:
+                breaker.record_success()
+                with self._lock:
+                    self._latencies[model].append(time.monotonic() - started)
+                return result
+            if result.fatal:
+                # Every exit must end a probe, or the breaker would refuse this model for good
+                breaker.release_probe()
+                return result
+
+            breaker.record_failure()
+            if not result.retryable or attempt_number == self.max_attempts - 1:
+                return result
+
+            delay = self.backoff_delay(attempt_number, result.retry_after)
+            if time.monotonic() + delay >= deadline:
+                return result
+            log_event("llm_retry", f"⏳ Retrying {model} in {delay:.1f}s", model=model, delay_seconds=round(delay, 2))
+            if cancelled is not None:
+                # Wakes as soon as another attempt wins, so an abandoned one makes no further paid calls
+                cancelled.wait(delay)
+            else:
+                time.sleep(delay)
+
+        return result
+
+    def run(self, attempt, hedge=True):
+        """Call attempt(model) until one succeeds, returning the winning AttemptResult"""
+        deadline = time.monotonic() + self.deadline
+        candidates = [model for model in self.models if not self.breakers[model].is_open()]
+        if not candidates:
+            return AttemptResult(error="❌ All DeepSeek models are temporarily unavailable after repeated failures. Please try again in a minute.")
+
+        if not hedge:
+            result = None
+            for model in candidates:
+                result = self._attempt_with_backoff(attempt, model, deadline)
+                if result.value is not None or result.fatal or time.monotonic() >= deadline:
+                    break
+            return result
+
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        cancelled = threading.Event()
+        pending = {}
+        remaining_models = deque(candidates)
+        last_result = None
+
+        def launch():
+            model = remaining_models.popleft()
+            log_event("llm_launch", f"🚀 Launching model {model}", model=model)
+            pending[executor.submit(self._attempt_with_backoff, attempt, model, deadline, cancelled)] = model
+            return time.monotonic() + self.hedge_delay(model)
+
+        try:
+            hedge_at = launch()
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    log_event("deadline_reached", "⏰ Generation deadline reached", logging.WARNING)
+                    break
+
+                timeout = deadline - now
+                if remaining_models:
+                    timeout = min(timeout, max(0.0, hedge_at - now))
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    if remaining_models:
+                        log_event("llm_hedge", f"🐢 {', '.join(pending.values())} slower than usual, hedging with another model", slow_models=list(pending.values()))
+                        hedge_at = launch()
+                    continue
+
+                for future in done:
+                    pending.pop(future)
+                    result = future.result()
+                    if result.value is not None or result.fatal:
+                        return result
+                    last_result = result
+
+                # Replace a failed attempt with the next model straight away
+                if remaining_models and not pending:
+                    hedge_at = launch()
+
+            return last_result or AttemptResult(error="❌ DeepSeek did not respond before the generation deadline.")
+        finally:
+            # Slower hedged attempts are abandoned: their current request finishes in the background, but no retry follows
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,238 @@
+"""
+PDF report engine for quizzes of any size
+Questions are laid out directly on a ReportLab canvas with fonts and metrics
+fixed once per process, which skips Platypus paragraph parsing and story
+building. The report is written to a spooled temporary file that moves to disk
+once it is large. Big question banks are rendered as sections (in worker
+processes when there are several) and their pages are copied into the report
+one section at a time, so memory stays bounded by a section, not the report.
+"""
+
+import os
+import tempfile
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+
+from document_reader import get_process_pool
+
+PAGE_WIDTH, PAGE_HEIGHT = letter
+MARGIN = 72
+TEXT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+
+TITLE_FONT = ("Helvetica-Bold", 24)
+HEADING_FONT = ("Helvetica-Bold", 14)
+BODY_FONT = ("Helvetica", 10)
+BODY_LEADING = 12
+QUESTION_SPACING = 10
+
+
+def question_lines(number, question_data):
+    """Wrapped text lines of a question and its options"""
+    font_name, font_size = BODY_FONT
+    lines = simpleSplit(f"Question {number}: {question_data['question']}", font_name, font_size, TEXT_WIDTH)
+    for j, option in enumerate(['A', 'B', 'C', 'D']):
+        option_text = f"{option}. {question_data['options'][j]}"
+        if option == question_data['answer']:
+            option_text += " (Correct Answer)"
+        lines.extend(simpleSplit(option_text, font_name, font_size, TEXT_WIDTH))
+    return lines
+
+
+def render_section(questions, first_number, output, include_title):
+    """Render questions (numbered from first_number) as a PDF into output, a path or binary file"""
+    pdf = canvas.Canvas(output, pagesize=letter)
+    y = PAGE_HEIGHT - MARGIN
+
+    if include_title:
+        pdf.setFont(*TITLE_FONT)
+        pdf.drawCentredString(PAGE_WIDTH / 2, y - TITLE_FONT[1], "AI Quiz Generator Report")
+        y -= TITLE_FONT[1] + 50
+        pdf.setFont(*HEADING_FONT)
+        pdf.drawString(MARGIN, y - HEADING_FONT[1], "Quiz Questions")
+        y -= HEADING_FONT[1] + 12
+
+    for number, question_data in enumerate(questions, first_number):
+        lines = question_lines(number, question_data)
+        height = len(lines) * BODY_LEADING
+        # Questions that fit on a page are kept whole: start a new page rather than split one across two
+        if y - height < MARGIN and y < PAGE_HEIGHT - MARGIN and height <= PAGE_HEIGHT - 2 * MARGIN:
+            pdf.showPage()
+            y = PAGE_HEIGHT - MARGIN
+
+        # A question taller than a page continues on the next one
+        text = None
+        for line in lines:
+            if y - BODY_LEADING < MARGIN:
+                if text is not None:
+                    pdf.drawText(text)
+                pdf.showPage()
+                y = PAGE_HEIGHT - MARGIN
+                text = None
+            if text is None:
+                text = pdf.beginText(MARGIN, y - BODY_FONT[1])
+                text.setFont(*BODY_FONT, leading=BODY_LEADING)
+            text.textLine(line)
+            y -= BODY_LEADING
+        pdf.drawText(text)
+        y -= QUESTION_SPACING
+
+    pdf.save()
+
+
+def _render_section_file(questions, first_number, include_title):
+    """Worker process entry point: render a section to a temporary file and return its path"""
+    fd, path = tempfile.mkstemp(prefix="quiz-report-", suffix=".pdf")
+    os.close(fd)
+    render_section(questions, first_number, path, include_title)
+    return path
+
+
+class StreamingPdfMerger:
+    """Append the pages of PDF files to a new PDF in output, writing each file's objects as it is read
+
+    Only byte offsets and page object numbers are kept between files, unlike PyPDF2's
+    PdfWriter, which holds every appended page until the whole document is written.
+    """
+
+    PAGES_ID = 1
+    CATALOG_ID = 2
+    # Page attributes a page may inherit from its page tree nodes
+    INHERITED = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+    def __init__(self, output):
+        self.output = output
+        self.base = output.tell()
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = self.CATALOG_ID + 1
+        output.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def append(self, path):
+        """Copy every page of the PDF at path, with the objects they use, to the end of the output"""
+        reader = PdfReader(path)
+        new_ids = {}
+        pending = []
+
+        def reference(indirect):
+            key = (indirect.idnum, indirect.generation)
+            if key not in new_ids:
+                new_ids[key] = self._reserve_id()
+                pending.append(indirect)
+            return IndirectObject(new_ids[key], 0, None)
+
+        def copy(obj):
+            if isinstance(obj, IndirectObject):
+                return reference(obj)
+            if isinstance(obj, DictionaryObject):
+                duplicate = obj.__class__()
+                if hasattr(obj, "_data"):
+                    duplicate._data = obj._data
+                for key, value in obj.items():
+                    # Stream lengths are rewritten on output; parents are replaced by this report's page tree
+                    if key not in ("/Length", "/Parent"):
+                        duplicate[key] = copy(value)
+                return duplicate
+            if isinstance(obj, ArrayObject):
+                return ArrayObject(copy(value) for value in obj)
+            return obj
+
+        for page_ref, inherited in self._page_refs(reader.trailer["/Root"].raw_get("/Pages"), {}):
+            page = copy(page_ref.get_object())
+            for key, value in inherited.items():
+                if key not in page:
+                    page[NameObject(key)] = copy(value)
+            page[NameObject("/Parent")] = IndirectObject(self.PAGES_ID, 0, None)
+            page_id = self._reserve_id()
+            self._write_object(page_id, page)
+            self.page_ids.append(page_id)
+
+        while pending:
+            indirect = pending.pop()
+            self._write_object(new_ids[(indirect.idnum, indirect.generation)], copy(indirect.get_object()))
+
+    def _page_refs(self, node_ref, inherited):
+        node = node_ref.get_object()
+        if node.get("/Type") != "/Pages":
+            yield node_ref, inherited
+            return
+        inherited = {**inherited, **{key: node.raw_get(key) for key in self.INHERITED if key in node}}
+        for kid in node["/Kids"]:
+            yield from self._page_refs(kid, inherited)
+
+    def _reserve_id(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def _write_object(self, object_id, obj):
+        self.offsets[object_id] = self.output.tell() - self.base
+        self.output.write(f"{object_id} 0 obj\n".encode("ascii"))
+        obj.write_to_stream(self.output, None)
+        self.output.write(b"\nendobj\n")
+
+    def finish(self):
+        """Write the page tree, catalog, cross-reference table and trailer"""
+        pages = DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(IndirectObject(page_id, 0, None) for page_id in self.page_ids),
+            NameObject("/Count"): NumberObject(len(self.page_ids)),
+        })
+        self._write_object(self.PAGES_ID, pages)
+        catalog = DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): IndirectObject(self.PAGES_ID, 0, None),
+        })
+        self._write_object(self.CATALOG_ID, catalog)
+
+        xref_offset = self.output.tell() - self.base
+        lines = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+        lines.extend(f"{self.offsets[object_id]:010d} 00000 n \n" for object_id in range(1, self.next_id))
+        lines.append(f"trailer\n<< /Size {self.next_id} /Root {self.CATALOG_ID} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self.output.write("".join(lines).encode("ascii"))
+
+
+def build_pdf_report(data, spool_max_bytes=8 * 1024 * 1024, workers=1, section_questions=500):
+    """Render the quiz report and return it as a spooled temporary file positioned at the start"""
+    questions = data['quiz']
+    output = tempfile.SpooledTemporaryFile(max_size=spool_max_bytes)
+
+    if len(questions) <= section_questions * 2:
+        render_section(questions, 1, output, include_title=True)
+        output.seek(0)
+        return output
+
+    starts = range(0, len(questions), section_questions)
+    merger = StreamingPdfMerger(output)
+    if workers <= 1:
+        # One section at a time, so a single canvas never holds the whole report
+        for start in starts:
+            path = _render_section_file(questions[start:start + section_questions], start + 1, start == 0)
+            try:
+                merger.append(path)
+            finally:
+                os.remove(path)
+        merger.finish()
+        output.seek(0)
+        return output
+
+    pool = get_process_pool(workers)
+    futures = [
+        pool.submit(_render_section_file, questions[start:start + section_questions], start + 1, start == 0)
+        for start in starts
+    ]
+    try:
+        for future in futures:
+            merger.append(future.result())
+        merger.finish()
+    finally:
+        # Remove every section file that was written, including after a failure
+        for future in futures:
+            if not future.cancel() and future.exception() is None:
+                os.remove(future.result())
+
+    output.seek(0)
+    return output
@@ -0,0 +1,233 @@
+"""
+SQLite question bank
+Keeps every generated quiz per source (YouTube video ID, document or text hash,
+playlist or channel), indexed by source and creation time, with an FTS5 index
+over questions and options so existing questions can be found and reused
+instead of generating them again. The questions generated from each chunk of
+source text are kept by chunk fingerprint for a limited time, up to a set
+number of chunks, so an edited document only sends its changed chunks back
+to the model.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS quizzes (
+        id INTEGER PRIMARY KEY,
+        source_type TEXT NOT NULL,
+        source_id TEXT NOT NULL,
+        title TEXT,
+        content_hash TEXT NOT NULL,
+        question_count INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        UNIQUE (source_id, content_hash)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS quizzes_by_source ON quizzes (source_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS quizzes_by_created ON quizzes (created_at)",
+    """
+    CREATE TABLE IF NOT EXISTS questions (
+        id INTEGER PRIMARY KEY,
+        quiz_id INTEGER NOT NULL REFERENCES quizzes (id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        question TEXT NOT NULL,
+        options TEXT NOT NULL,
+        answer TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS questions_by_quiz ON questions (quiz_id, position)",
+    # Rowids follow questions.id; options are indexed as one space-separated text
+    "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(question, options, tokenize='unicode61 remove_diacritics 2')",
+    # Questions generated from each chunk of source text, keyed by the chunk's fingerprint
+    """
+    CREATE TABLE IF NOT EXISTS chunks (
+        chunk_key TEXT PRIMARY KEY,
+        questions TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS chunks_by_created ON chunks (created_at)",
+]
+
+# Chunks stored between two prunes of the chunks table
+CHUNK_PRUNE_INTERVAL = 100
+
+
+def match_query(text):
+    """FTS5 query matching every word of free text, the last one as a prefix; None if it has no words"""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class QuestionBank:
+    """Quizzes and their questions, stored per source and searchable by text"""
+
+    def __init__(self, db_path, chunk_ttl_seconds=None, max_chunks=None):
+        self.db_path = db_path
+        self.chunk_ttl_seconds = chunk_ttl_seconds
+        self.max_chunks = max_chunks
+        self._chunks_added = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+
+    def _connect(self):
+        # A short-lived connection per call keeps the bank safe to use from any thread or process
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def add_quiz(self, source_type, source_id, questions, content_hash, title=None):
+        """Store a quiz for a source; returns its id, or None if this exact quiz is already stored"""
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO quizzes (source_type, source_id, title, content_hash, question_count, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (source_type, source_id, title, content_hash, len(questions), time.time()),
+            )
+            if cursor.rowcount == 0:
+                return None
+            quiz_id = cursor.lastrowid
+            for position, question_data in enumerate(questions):
+                options = [str(option) for option in question_data['options']]
+                question_id = conn.execute(
+                    "INSERT INTO questions (quiz_id, position, question, options, answer) VALUES (?, ?, ?, ?, ?)",
+                    (quiz_id, position, question_data['question'], json.dumps(options, ensure_ascii=False),
+                     str(question_data['answer'])),
+                ).lastrowid
+                conn.execute(
+                    "INSERT INTO questions_fts (rowid, question, options) VALUES (?, ?, ?)",
+                    (question_id, question_data['question'], " ".join(options)),
+                )
+            return quiz_id
+
+    def latest_quiz(self, source_id):
+        """The most recently stored quiz for a source as {"quiz": [...], "created_at", ...}, or None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, source_type, title, created_at FROM quizzes WHERE source_id = ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (source_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            quiz_id, source_type, title, created_at = row
+            questions = conn.execute(
+                "SELECT question, options, answer FROM questions WHERE quiz_id = ? ORDER BY position",
+                (quiz_id,),
+            ).fetchall()
+
+        return {
+            "quiz": [
+                {"question": question, "options": json.loads(options), "answer": answer}
+                for question, options, answer in questions
+            ],
+            "source_type": source_type,
+            "source_id": source_id,
+            "title": title,
+            "created_at": created_at,
+        }
+
+    def search(self, text, limit=50, source_id=None):
+        """Questions whose text or options contain every word of text, best matches first"""
+        query = match_query(text)
+        if query is None:
+            return []
+
+        sql = (
+            "SELECT q.question, q.options, q.answer, z.source_type, z.source_id, z.title, z.created_at "
+            "FROM questions_fts f JOIN questions q ON q.id = f.rowid JOIN quizzes z ON z.id = q.quiz_id "
+            "WHERE questions_fts MATCH ?"
+        )
+        params = [query]
+        if source_id is not None:
+            sql += " AND z.source_id = ?"
+            params.append(source_id)
+        sql += " ORDER BY f.rank LIMIT ?"
+        params.append(limit)
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        return [
+            {
+                "question": question,
+                "options": json.loads(options),
+                "answer": answer,
+                "source_type": source_type,
+                "source_id": source_id,
+                "title": title,
+                "created_at": created_at,
+            }
+            for question, options, answer, source_type, source_id, title, created_at in rows
+        ]
+
+    def add_chunk_questions(self, chunk_key, questions):
+        """Remember the questions generated from one chunk of source text; an empty list is not stored"""
+        if not questions:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chunks (chunk_key, questions, created_at) VALUES (?, ?, ?)",
+                (chunk_key, json.dumps(questions, ensure_ascii=False), time.time()),
+            )
+        with self._lock:
+            self._chunks_added += 1
+            due = self._chunks_added % CHUNK_PRUNE_INTERVAL == 1
+        if due:
+            self.prune_chunks()
+
+    def prune_chunks(self):
+        """Delete expired chunks, then the oldest ones beyond max_chunks; returns the number deleted"""
+        with closing(self._connect()) as conn, conn:
+            deleted = 0
+            if self.chunk_ttl_seconds is not None:
+                deleted += conn.execute(
+                    "DELETE FROM chunks WHERE created_at < ?", (time.time() - self.chunk_ttl_seconds,)
+                ).rowcount
+            if self.max_chunks is not None:
+                deleted += conn.execute(
+                    "DELETE FROM chunks WHERE created_at <= "
+                    "(SELECT created_at FROM chunks ORDER BY created_at DESC LIMIT 1 OFFSET ?)",
+                    (self.max_chunks,),
+                ).rowcount
+            return deleted
+
+    def chunk_questions(self, chunk_keys):
+        """{chunk key: questions} for the chunks among chunk_keys that have unexpired questions stored"""
+        found = {}
+        oldest = 0 if self.chunk_ttl_seconds is None else time.time() - self.chunk_ttl_seconds
+        with closing(self._connect()) as conn:
+            # Stay well under SQLite's limit on bound parameters
+            for start in range(0, len(chunk_keys), 500):
+                batch = chunk_keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT chunk_key, questions FROM chunks WHERE chunk_key IN ({', '.join('?' * len(batch))}) "
+                    "AND created_at >= ?",
+                    [*batch, oldest],
+                ).fetchall()
+                found.update((chunk_key, json.loads(questions)) for chunk_key, questions in rows)
+        return found
+
+    def stats(self):
+        with closing(self._connect()) as conn:
+            quizzes, = conn.execute("SELECT COUNT(*) FROM quizzes").fetchone()
+            questions, = conn.execute("SELECT COUNT(*) FROM questions").fetchone()
+        return {"quizzes": quizzes, "questions": questions}
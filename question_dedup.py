@@ -0,0 +1,90 @@
+"""
+Near-duplicate question elimination with MinHash and locality-sensitive hashing
+Each question (with its correct answer) becomes a set of content words, its
+MinHash signature is split into LSH bands, and only questions sharing a band
+are compared, so deduplicating n questions takes roughly linear time.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "did", "do", "does", "for",
+    "from", "how", "in", "is", "it", "its", "of", "on", "or", "that", "the", "this",
+    "to", "was", "what", "when", "where", "which", "who", "why", "with", "according",
+    "text", "following", "mentioned", "described",
+}
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def question_shingles(question_data):
+    """Content words of the question and its correct answer"""
+    text = str(question_data.get("question", ""))
+    options = question_data.get("options") or []
+    answer = str(question_data.get("answer", "")).strip().upper()
+    if len(answer) == 1 and "A" <= answer <= "Z" and ord(answer) - ord("A") < len(options):
+        text += " " + str(options[ord(answer) - ord("A")])
+
+    words = [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+    return set(words) or {text.lower().strip()}
+
+
+def choose_bands(num_perm, threshold):
+    """Pick (bands, rows) whose LSH threshold (1/bands)^(1/rows) is closest to threshold"""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class QuestionDeduplicator:
+    """Incremental near-duplicate filter: add() each question, keep the ones it accepts"""
+
+    def __init__(self, threshold=0.7, num_perm=64, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+        self._signatures = []
+
+    def signature(self, shingles):
+        """MinHash signature of a set of strings"""
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, question_data):
+        """Index the question and return True, or return False if it near-duplicates a kept one"""
+        signature = self.signature(question_shingles(question_data))
+
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        for index in candidates:
+            # The fraction of equal MinHash values estimates the Jaccard similarity
+            if np.count_nonzero(self._signatures[index] == signature) / self.num_perm >= self.threshold:
+                return False
+
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for band, key in self._band_keys(signature):
+            self._buckets[band][key].append(index)
+        return True
@@ -0,0 +1,152 @@
+"""
+Content-addressed on-disk cache for generated quizzes
+Entries are JSON files named by the SHA-256 of their key, so every Streamlit
+session and process pointed at the same directory shares the same results.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class QuizCache:
+    """Persistent quiz cache with a TTL and size-based LRU eviction"""
+
+    # How long stats() reuses the last directory walk before walking again
+    SIZE_REFRESH_SECONDS = 60
+
+    def __init__(self, cache_dir, max_bytes, ttl_seconds):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._size = None  # (checked_at, entries, bytes) from the last directory walk
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(source_text, **params):
+        """Build a cache key from the normalized source text and generation parameters"""
+        normalized_text = " ".join(source_text.split())
+        payload = json.dumps({"text": normalized_text, **params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key, count=True):
+        """Return the cached data for key, or None if it is missing or expired
+
+        count=False leaves the hit/miss counters alone, for a second look at a key already counted.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            if count:
+                self._count(hit=False)
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            self._remove(path)
+            if count:
+                self._count(hit=False)
+            return None
+
+        # Touch the file so its mtime tracks the last access for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        if count:
+            self._count(hit=True)
+        return entry["data"]
+
+    def set(self, key, data):
+        """Store data under key, then evict the least recently used entries if over the size cap"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"created_at": time.time(), "data": data}
+
+        # Write to a temp file and rename so readers in other processes never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            raise
+
+        self._evict()
+
+    def _entries(self):
+        """List (mtime, size, path) for every cache entry"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _record_size(self, entries, total_bytes):
+        with self._lock:
+            self._size = (time.monotonic(), entries, total_bytes)
+
+    def _evict(self):
+        entries = self._entries()
+        total_bytes = sum(size for _, size, _ in entries)
+        remaining = len(entries)
+        if total_bytes > self.max_bytes:
+            for _, size, path in sorted(entries):
+                self._remove(path)
+                total_bytes -= size
+                remaining -= 1
+                if total_bytes <= self.max_bytes:
+                    break
+        self._record_size(remaining, total_bytes)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def stats(self):
+        """Return hit/miss counters for this process and the size of the cache
+
+        The size comes from the last directory walk (every set() does one) and is refreshed
+        only when older than SIZE_REFRESH_SECONDS, so calling this on every rerun stays cheap.
+        """
+        with self._lock:
+            size = self._size
+        if size is None or time.monotonic() - size[0] > self.SIZE_REFRESH_SECONDS:
+            entries = self._entries()
+            self._record_size(len(entries), sum(entry_size for _, entry_size, _ in entries))
+        with self._lock:
+            _, entries, total_bytes = self._size
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": entries,
+                "bytes": total_bytes,
+            }
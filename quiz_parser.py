@@ -0,0 +1,118 @@
+"""
+Incremental parser for quiz JSON produced by the model
+Questions are pulled out of the "quiz" array as soon as each object closes,
+so callers can use them while the rest of the completion is still arriving,
+and every complete question can be salvaged from a truncated response.
+"""
+
+import json
+import re
+
+QUIZ_ARRAY_PATTERN = re.compile(r'"quiz"\s*:\s*\[')
+BARE_ARRAY_PATTERN = re.compile(r'\[')
+
+
+def is_displayable_question(question_data):
+    """Check a question has the fields display_results, the PDF report and the question bank rely on"""
+    return (
+        isinstance(question_data, dict)
+        and isinstance(question_data.get('question'), str)
+        and isinstance(question_data.get('options'), list)
+        and len(question_data['options']) >= 4
+        and 'answer' in question_data
+    )
+
+
+class QuizStreamParser:
+    """Feed partial model output in; get fully formed question objects out"""
+
+    def __init__(self, array_pattern=QUIZ_ARRAY_PATTERN):
+        self.array_pattern = array_pattern
+        self.buffer = ""
+        self.questions = []
+        self._pos = None  # Scan position inside the quiz array, None until it is found
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._object_start = None
+        self._done = False
+
+    def feed(self, text):
+        """Add more model output and return the questions completed by it"""
+        self.buffer += text
+        if self._pos is None:
+            match = self.array_pattern.search(self.buffer)
+            if not match:
+                return []
+            self._pos = match.end()
+        if self._done:
+            return []
+
+        completed = []
+        buffer = self.buffer
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._object_start = pos
+                self._depth += 1
+            elif char == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    question_data = self._load(buffer[self._object_start:pos + 1])
+                    if question_data is not None:
+                        completed.append(question_data)
+                    self._object_start = None
+            elif char == "]" and self._depth == 0:
+                # End of the quiz array; anything after it is not a question
+                self._done = True
+                break
+        self._pos = len(buffer)
+
+        self.questions.extend(completed)
+        return completed
+
+    @staticmethod
+    def _load(fragment):
+        try:
+            question_data = json.loads(fragment)
+        except json.JSONDecodeError:
+            return None
+        return question_data if is_displayable_question(question_data) else None
+
+
+def parse_quiz_content(content):
+    """Parse a completion into {"quiz": [...]}, salvaging complete questions if it is cut off
+
+    Returns (parsed_result, recovered) where recovered is None when the JSON was
+    well formed, or the number of questions salvaged from a broken response.
+    Questions missing fields are dropped either way, and parsed_result is None
+    when not a single usable question is left.
+    """
+    json_match = re.search(r'\{.*\}', content, re.DOTALL)
+    if json_match:
+        try:
+            parsed_result = json.loads(json_match.group(0))
+        except json.JSONDecodeError:
+            parsed_result = None
+        if isinstance(parsed_result, dict) and isinstance(parsed_result.get("quiz"), list):
+            quiz = [question_data for question_data in parsed_result["quiz"] if is_displayable_question(question_data)]
+            return ({**parsed_result, "quiz": quiz}, None) if quiz else (None, 0)
+
+    # Fall back to pulling out each complete question object, with or without the "quiz" key
+    for array_pattern in (QUIZ_ARRAY_PATTERN, BARE_ARRAY_PATTERN):
+        parser = QuizStreamParser(array_pattern)
+        parser.feed(content)
+        if parser.questions:
+            return {"quiz": parser.questions}, len(parser.questions)
+
+    return None, 0
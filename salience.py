@@ -0,0 +1,90 @@
+"""
+Extractive salience filter for long sources
+Scores sentences by TF-IDF with NumPy and greedily keeps the most informative
+ones within a token budget. Each pick halves the weight of the terms it covers,
+so later picks favour topics not yet represented instead of repeating the top one.
+The kept sentences are returned in their original order.
+"""
+
+import math
+import re
+
+import numpy as np
+
+from content_chunks import iter_sentences
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+STOPWORDS = {
+    "a", "about", "after", "all", "also", "an", "and", "any", "are", "as", "at", "be", "because",
+    "been", "but", "by", "can", "could", "did", "do", "does", "for", "from", "had", "has", "have",
+    "he", "her", "here", "him", "his", "how", "i", "if", "in", "into", "is", "it", "it's", "its",
+    "just", "know", "like", "me", "more", "my", "no", "not", "now", "of", "oh", "ok", "okay", "on",
+    "one", "or", "our", "out", "really", "right", "she", "so", "some", "than", "that", "that's",
+    "the", "their", "them", "then", "there", "these", "they", "thing", "things", "this", "those",
+    "to", "um", "uh", "up", "very", "was", "we", "well", "were", "what", "when", "where", "which",
+    "who", "will", "with", "would", "yeah", "you", "your",
+}
+
+
+def split_sentences(text, max_chars=math.inf):
+    """Sentences (or transcript lines) of text, stripped and without empties
+
+    Sentences longer than max_chars are cut between words, so unpunctuated auto-captions
+    still yield pieces that fit the budget.
+    """
+    return [sentence.strip() for sentence in iter_sentences(text, max_chars) if sentence.strip()]
+
+
+def select_salient_sentences(text, max_tokens, chars_per_token=3.5, redundancy_decay=0.5):
+    """Return text reduced to its most informative sentences, about max_tokens long"""
+    budget_chars = int(max_tokens * chars_per_token)
+    if len(text) <= budget_chars:
+        return text
+
+    sentences = split_sentences(text, budget_chars)
+    vocabulary = {}
+    sentence_ids, term_ids = [], []
+    for index, sentence in enumerate(sentences):
+        for word in WORD_PATTERN.findall(sentence.lower()):
+            if word not in STOPWORDS and len(word) > 1:
+                sentence_ids.append(index)
+                term_ids.append(vocabulary.setdefault(word, len(vocabulary)))
+    if not vocabulary:
+        return text[:budget_chars]
+
+    # Sparse sentence x term counts as (sentence, term) pairs with their term frequency
+    pair_keys, pair_counts = np.unique(
+        np.array(sentence_ids, dtype=np.int64) * len(vocabulary) + np.array(term_ids, dtype=np.int64),
+        return_counts=True,
+    )
+    pair_sentences, pair_terms = np.divmod(pair_keys, len(vocabulary))
+    document_frequency = np.bincount(pair_terms, minlength=len(vocabulary))
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    pair_weights = (1 + np.log(pair_counts)) * idf[pair_terms]
+
+    lengths = np.array([len(sentence) + 1 for sentence in sentences])
+    # Square-root length normalisation: long sentences carry more but not proportionally more
+    norms = np.sqrt(np.bincount(pair_sentences, minlength=len(sentences)).clip(min=1))
+    term_factor = np.ones(len(vocabulary))
+    available = np.ones(len(sentences), dtype=bool)
+    selected = []
+    remaining = budget_chars
+
+    while True:
+        available &= lengths <= remaining
+        if not available.any():
+            break
+        scores = np.bincount(pair_sentences, weights=pair_weights * term_factor[pair_terms], minlength=len(sentences)) / norms
+        scores[~available] = -math.inf
+        best = int(np.argmax(scores))
+        if scores[best] <= 0:
+            break
+        selected.append(best)
+        available[best] = False
+        remaining -= lengths[best]
+        term_factor[pair_terms[pair_sentences == best]] *= redundancy_decay
+
+    if not selected:
+        return text[:budget_chars]
+    return " ".join(sentences[index] for index in sorted(selected))
@@ -0,0 +1,129 @@
+"""
+Single-flight coalescing for identical concurrent work
+Callers asking for the same key while a call is in flight wait for it and share
+its result instead of repeating it. Across processes a per-key file lock plays
+the same role: the first process does the work, the others wait for the lock
+and then find the result in the shared cache through `recheck`.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalescing stays within the process
+    fcntl = None
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls by key within the process and, with lock_dir, across processes"""
+
+    def __init__(self, lock_dir=None, wait_timeout=300, poll_interval=0.05):
+        self.lock_dir = lock_dir if fcntl is not None else None
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.leaders = 0
+        self.followers = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+    def do(self, key, func, recheck=None):
+        """Return func() for key, sharing one call among concurrent callers
+
+        recheck() runs once the cross-process lock is held; if it returns something
+        other than None (another process finished the work) that is returned instead.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            with self._process_lock(key):
+                result = recheck() if recheck is not None else None
+                if result is None:
+                    result = func()
+            call.result = result
+            return result
+        except BaseException as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    @contextmanager
+    def _process_lock(self, key):
+        """Hold an exclusive lock file for key, or give up waiting after wait_timeout and go ahead"""
+        if not self.lock_dir:
+            yield
+            return
+
+        path = os.path.join(self.lock_dir, hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + ".lock")
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            lock_file = open(path, "a")
+            locked = self._flock(lock_file, deadline)
+            if not locked or self._is_current(lock_file, path):
+                break
+            # The holder removed this file before unlocking it, and a newcomer may already hold
+            # the file now at path, so lock that one instead
+            lock_file.close()
+
+        with lock_file:
+            try:
+                yield
+            finally:
+                if locked:
+                    # Remove before unlocking: waiters on this file then see it is stale and retry
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _flock(self, lock_file, deadline):
+        """Take an exclusive lock on lock_file, polling until deadline; True if it was taken"""
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(self.poll_interval)
+
+    @staticmethod
+    def _is_current(lock_file, path):
+        """Whether lock_file is still the file at path"""
+        try:
+            return os.fstat(lock_file.fileno()).st_ino == os.stat(path).st_ino
+        except FileNotFoundError:
+            return False
+
+    def stats(self):
+        with self._lock:
+            return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._calls)}
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Startup profile for AI Quiz Generator
+Imports the app in a fresh interpreter with -X importtime and reports what each
+direct dependency costs at startup, plus what the lazily imported dependencies
+cost on first use. Run it before and after a change to spot import regressions.
+
+Usage:
+    python startup_profile.py
+    python startup_profile.py --repeat 5 --max-ms 600 --json startup_profile.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Imported on first use rather than at startup; profiled on their own for reference
+DEFERRED_DEPENDENCIES = ["youtube_transcript_api", "PyPDF2", "reportlab.pdfgen.canvas", "numpy"]
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_times(module):
+    """Import module in a fresh interpreter; returns (total ms, {direct import: cumulative ms}, all modules loaded)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    total = None
+    children = {}
+    pending = {}
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip())) // 2
+        loaded.add(name.strip())
+        # -X importtime lists a module's imports before the module itself
+        if depth == 1:
+            pending[name.strip()] = int(cumulative) / 1000
+        elif depth == 0:
+            if name.strip() == module:
+                total = int(cumulative) / 1000
+                children = pending
+            pending = {}
+    if total is None:
+        # Already imported by the interpreter itself, so it never shows up
+        total = 0.0
+    return total, children, loaded
+
+
+def profile(module, repeat):
+    """Best of `repeat` runs for the module and for each deferred dependency"""
+    runs = [import_times(module) for _ in range(repeat)]
+    total, children, loaded = min(runs, key=lambda run: run[0])
+    deferred = {}
+    for dependency in DEFERRED_DEPENDENCIES:
+        try:
+            deferred[dependency] = round(min(import_times(dependency)[0] for _ in range(repeat)), 1)
+        except RuntimeError:
+            deferred[dependency] = None
+    return {
+        "module": module,
+        "total_ms": round(total, 1),
+        "imports_ms": {name: round(ms, 1) for name, ms in sorted(children.items(), key=lambda item: -item[1])},
+        "deferred_ms": deferred,
+        "deferred_loaded_at_startup": [dependency for dependency in DEFERRED_DEPENDENCIES if dependency in loaded],
+        "python": sys.version.split()[0],
+    }
+
+
+def print_report(report, top):
+    print(f"🚀 Startup profile: import {report['module']} took {report['total_ms']:.1f} ms")
+    print("=" * 50)
+    print(f"{'direct import':<36}{'ms':>10}")
+    for name, ms in list(report["imports_ms"].items())[:top]:
+        print(f"{name:<36}{ms:>10.1f}")
+    print("=" * 50)
+    print(f"{'deferred (cost on first use)':<36}{'ms':>10}")
+    for name, ms in report["deferred_ms"].items():
+        print(f"{name:<36}{'not installed' if ms is None else f'{ms:.1f}':>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-dependency import time of the app at startup.")
+    parser.add_argument("--module", default="app", help="Module to profile (default: app)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per import; the fastest is reported")
+    parser.add_argument("--top", type=int, default=15, help="Direct imports to list")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    parser.add_argument("--max-ms", type=float, help="Exit with status 1 if the startup import takes longer than this")
+    args = parser.parse_args()
+
+    try:
+        report = profile(args.module, max(1, args.repeat))
+    except RuntimeError as e:
+        print(f"❌ {str(e)}")
+        return False
+    print_report(report, args.top)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report written to {args.json}")
+
+    if report["deferred_loaded_at_startup"]:
+        print(f"⚠️ Imported at startup but expected to be deferred: {', '.join(report['deferred_loaded_at_startup'])}")
+
+    if args.max_ms is not None and report["total_ms"] > args.max_ms:
+        print(f"❌ Startup import exceeds the {args.max_ms:.0f} ms budget")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
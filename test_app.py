@@ -0,0 +1,188 @@
+"""
+Tests for generation helpers in app.py, with the model API and YouTube stubbed out
+"""
+
+import json
+import time
+from types import SimpleNamespace
+
+import app
+from model_scheduler import AttemptResult, ModelScheduler
+from transcript_store import TranscriptStore
+
+GOOD = {"question": "What is 2 + 2?", "options": ["1", "2", "3", "4"], "answer": "D"}
+
+
+class StreamResponse:
+    status_code = 200
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class StreamSession:
+    def post(self, *args, **kwargs):
+        return StreamResponse()
+
+
+def stream_then_raise(content):
+    def iter_sse_content(response, usage=None):
+        yield content
+        raise KeyError("choices")
+    return iter_sse_content
+
+
+def test_odd_stream_payload_is_a_failed_attempt_not_a_crash(monkeypatch):
+    monkeypatch.setattr(app, "get_http_session", lambda: StreamSession())
+    monkeypatch.setattr(app, "iter_sse_content", stream_then_raise('{"quiz": ['))
+    result = app.stream_quiz_from_model("model", "prompt", "key", lambda question_data: None, 100)
+    assert result.error and "choices" in result.error
+    assert not result.retryable
+
+
+def test_questions_streamed_before_an_error_are_kept(monkeypatch):
+    emitted = []
+    monkeypatch.setattr(app, "get_http_session", lambda: StreamSession())
+    monkeypatch.setattr(app, "iter_sse_content", stream_then_raise('{"quiz": [' + json.dumps(GOOD) + ','))
+    result = app.stream_quiz_from_model("model", "prompt", "key", emitted.append, 100)
+    assert result.value == 1
+    assert emitted == [GOOD]
+
+
+class RecordingLimiter:
+    def __init__(self, events):
+        self.events = events
+
+    def acquire(self):
+        self.events.append("acquire")
+        return 0
+
+
+class StubTranscriptClient:
+    """Stands in for YouTubeTranscriptApi, recording each request it would make"""
+
+    def __init__(self, events, segments):
+        self.events = events
+        self.segments = segments
+
+    def list(self, video_id):
+        self.events.append("list")
+        return self
+
+    def find_transcript(self, languages):
+        return self
+
+    def fetch(self):
+        self.events.append("fetch")
+        return self.segments
+
+
+def test_each_youtube_request_of_a_transcript_waits_for_the_rate_limit(tmp_path, monkeypatch):
+    events = []
+    segments = [SimpleNamespace(text="Cells have membranes", start=0.0, duration=1.0)]
+    monkeypatch.setattr(app, "get_youtube_rate_limiter", lambda: RecordingLimiter(events))
+    monkeypatch.setattr(app, "get_youtube_client", lambda: StubTranscriptClient(events, segments))
+    store = TranscriptStore(str(tmp_path / "transcripts.db"), 60, 60)
+    assert app.fetch_transcript(store, "video", "en") == ("Cells have membranes", None)
+    assert events == ["acquire", "list", "acquire", "fetch"]
+
+
+def test_chunks_after_the_first_get_the_previous_sentence_as_context_only():
+    chunks = ["Cells have membranes. Mitochondria make energy.", "It is stored as ATP."]
+    assert app.chunk_context(chunks, 0) == ""
+    assert app.chunk_context(chunks, 1) == "Mitochondria make energy."
+    prompt = app.chunk_prompt(chunks[1], app.chunk_context(chunks, 1))
+    assert prompt.index("Mitochondria make energy.") < prompt.index("It is stored as ATP.")
+    assert app.chunk_prompt(chunks[0]) == app.QUIZ_PROMPT_TEMPLATE.format(text=chunks[0])
+    # The fingerprint covers the chunk alone, so editing the previous chunk keeps this one reusable
+    assert app.chunk_key(chunks[1]) == app.chunk_key("It is stored as ATP.")
+
+
+def use_scheduler(monkeypatch, deadline):
+    scheduler = ModelScheduler(
+        app.MODELS_TO_TRY,
+        hedge_percentile=0.95,
+        hedge_default_delay=5,
+        max_attempts=1,
+        backoff_base=0.01,
+        backoff_max=0.01,
+        failure_threshold=100,
+        reset_timeout=60,
+        deadline=deadline,
+    )
+    monkeypatch.setattr(app, "get_model_scheduler", lambda: scheduler)
+
+
+def record_requests(monkeypatch, delay):
+    requests_made = []
+
+    def request_quiz_from_model(model_name, prompt, api_key, temperature, max_tokens, timeout=app.API_TIMEOUT):
+        requests_made.append((temperature, timeout))
+        time.sleep(delay)
+        return AttemptResult(error="server error")
+
+    monkeypatch.setattr(app, "request_quiz_from_model", request_quiz_from_model)
+    return requests_made
+
+
+def test_fallback_request_gets_only_the_time_left_before_the_deadline(monkeypatch):
+    use_scheduler(monkeypatch, deadline=2)
+    requests_made = record_requests(monkeypatch, delay=0)
+    assert app.generate_quiz_for_chunk("Cells have membranes.", "key")[0] is None
+    temperature, timeout = requests_made[-1]
+    assert temperature == 0.9
+    assert 0 < timeout <= 2
+
+
+def test_no_fallback_request_once_the_deadline_has_passed(monkeypatch):
+    use_scheduler(monkeypatch, deadline=0.2)
+    requests_made = record_requests(monkeypatch, delay=0.1)
+    assert app.generate_quiz_for_chunk("Cells have membranes.", "key")[0] is None
+    time.sleep(0.5)
+    assert all(temperature != 0.9 for temperature, _ in requests_made)
+
+
+class PlaylistPageSession:
+    def __init__(self, video_ids):
+        self.video_ids = video_ids
+
+    def get(self, url, **kwargs):
+        text = "".join(f'{{"videoId":"{video_id}"}}' for video_id in self.video_ids)
+        return SimpleNamespace(status_code=200, text=text)
+
+
+def test_collections_are_capped_at_max_collection_videos_and_rate_limited(monkeypatch):
+    events = []
+    video_ids = [f"video{number:06d}" for number in range(10)]
+    monkeypatch.setattr(app, "get_http_session", lambda: PlaylistPageSession(video_ids))
+    monkeypatch.setattr(app, "get_youtube_rate_limiter", lambda: RecordingLimiter(events))
+    monkeypatch.setattr(app, "YOUTUBE_API_KEY", None)
+    monkeypatch.setattr(app, "MAX_COLLECTION_VIDEOS", 4)
+    assert app.expand_youtube_collection(("playlist", "PL1")) == (video_ids[:4], None)
+    assert events == ["acquire"]
+
+
+def test_videos_keep_their_order_when_transcripts_finish_out_of_order_or_fail(monkeypatch):
+    delays = {"first": 0.2, "broken": 0.0, "third": 0.0}
+
+    def get_transcript(video_id):
+        time.sleep(delays[video_id])
+        if video_id == "broken":
+            return None, "Captions are disabled for this video."
+        return video_id, None
+
+    progress = []
+    monkeypatch.setattr(app, "get_transcript", get_transcript)
+    monkeypatch.setattr(app, "generate_quiz_with_deepseek", lambda text, condense, reuse: (
+        {"quiz": [{"question": f"About {text}?", "options": ["a", "b", "c", "d"], "answer": "A"}]}, None
+    ))
+    parsed_result, error = app.generate_quiz_for_videos(
+        ["first", "broken", "third"], on_progress=lambda done, total, video_id, error: progress.append((video_id, error))
+    )
+    assert error is None
+    assert [question_data["question"] for question_data in parsed_result["quiz"]] == ["About first?", "About third?"]
+    assert progress[0] == ("broken", "Captions are disabled for this video.")
+    assert sorted(video_id for video_id, _ in progress) == ["broken", "first", "third"]
@@ -0,0 +1,53 @@
+"""
+Tests for the batch runner
+"""
+
+import json
+import os
+
+import batch
+
+
+def test_source_that_raises_is_recorded_and_run_continues(tmp_path, monkeypatch):
+    def process_source(source, condense=False):
+        if source == "bad":
+            raise KeyError("answer")
+        return {"source": source, "status": "ok", "quiz": [{"question": "Q"}]}
+
+    monkeypatch.setattr(batch, "process_source", process_source)
+    output_path = os.path.join(tmp_path, "out.jsonl")
+    assert batch.run_batch(["bad", "good"], output_path, 2) == (2, 1)
+
+    with open(output_path, encoding="utf-8") as output:
+        records = {record["source"]: record for record in map(json.loads, output)}
+    assert records["bad"]["status"] == "error"
+    assert records["bad"]["error"] == "KeyError: 'answer'"
+    assert records["good"]["status"] == "ok"
+
+
+def test_failed_prefetched_transcript_is_recorded_and_later_videos_still_run(tmp_path, monkeypatch):
+    fetched = []
+
+    def get_transcript(video_id):
+        fetched.append(video_id)
+        if video_id == "bbbbbbbbbbb":
+            return None, "Captions are disabled for this video."
+        return f"Transcript of {video_id}.", None
+
+    monkeypatch.setattr(batch, "get_transcript", get_transcript)
+    monkeypatch.setattr(batch, "generate_quiz_with_deepseek", lambda text, condense=False: ({"quiz": [{"question": text}]}, None))
+    monkeypatch.setattr(batch, "save_to_question_bank", lambda *args, **kwargs: None)
+
+    video_ids = ["aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc", "ddddddddddd"]
+    sources = [f"https://www.youtube.com/watch?v={video_id}" for video_id in video_ids]
+    output_path = os.path.join(tmp_path, "out.jsonl")
+    assert batch.run_batch(sources, output_path, 1, prefetch=2) == (4, 1)
+
+    with open(output_path, encoding="utf-8") as output:
+        records = [json.loads(line) for line in output]
+    assert [record["source"] for record in records] == sources
+    assert [record["status"] for record in records] == ["ok", "error", "ok", "ok"]
+    assert records[1]["stage"] == "transcript"
+    assert records[3]["quiz"] == [{"question": "Transcript of ddddddddddd."}]
+    # Prefetched once and asked for again when processed (the real get_transcript then reads its store)
+    assert sorted(fetched) == sorted(video_ids * 2)
@@ -0,0 +1,65 @@
+"""
+Tests for content-defined chunking
+"""
+
+import random
+
+from content_chunks import content_defined_chunks, iter_sentences
+
+WORDS = ["cell", "membrane", "energy", "protein", "river", "delta", "empire", "trade", "orbit", "signal"]
+
+
+def prose(sentences, seed=1):
+    rng = random.Random(seed)
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 18))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def test_chunks_cover_the_text_within_size_limits():
+    text = prose(2000)
+    chunks = content_defined_chunks(text, 2000, 4000, 8000)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 8000 for chunk in chunks)
+    assert all(len(chunk) >= 2000 for chunk in chunks[:-1])
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_edit_only_changes_nearby_chunks():
+    text = prose(2000)
+    before = content_defined_chunks(text, 2000, 4000, 8000)
+    middle = text.index(". ", len(text) // 2) + 2
+    edited = text[:middle] + "A brand new sentence about tides. " + text[middle:]
+    after = content_defined_chunks(edited, 2000, 4000, 8000)
+    assert sum(chunk not in before for chunk in after) <= 2
+
+
+def test_short_and_empty_text():
+    assert content_defined_chunks("  One sentence.  ", 10, 20, 100) == ["One sentence."]
+    assert content_defined_chunks("   ", 10, 20, 100) == []
+
+
+def test_overlong_sentences_are_split_between_words():
+    sentence = " ".join(["word"] * 100) + "."
+    pieces = list(iter_sentences(sentence, 50))
+    assert all(len(piece) <= 50 for piece in pieces)
+    assert "".join(pieces) == sentence
+
+
+def test_sentences_do_not_end_at_decimals_or_abbreviations():
+    from salience import split_sentences
+
+    assert split_sentences("Dr. Smith earned 3.5 million. He left!\nA new line") == [
+        "Dr. Smith earned 3.5 million.", "He left!", "A new line",
+    ]
+
+
+def test_unpunctuated_transcript_is_condensed_not_emptied():
+    from salience import select_salient_sentences
+
+    text = " ".join(f"topic{index % 500} detail{index % 37}" for index in range(12000))
+    condensed = select_salient_sentences(text, max_tokens=1000)
+    assert condensed
+    assert len(condensed) <= 3500
+    assert set(condensed.split()) <= set(text.split())
@@ -0,0 +1,34 @@
+"""
+Tests for the in-memory export cache
+"""
+
+import pytest
+
+from export_cache import ExportCache
+
+
+def test_artifact_is_built_once_and_then_served():
+    cache = ExportCache(max_bytes=1000)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return b"pdf"
+
+    assert cache.get_or_build("key", build) == b"pdf"
+    assert cache.get_or_build("key", build) == b"pdf"
+    assert builds == [1]
+    assert cache.stats()["hits"] == 1
+
+
+def test_failed_build_leaves_nothing_behind():
+    cache = ExportCache(max_bytes=1000)
+
+    def build():
+        raise ValueError("3 questions are missing their options or answer")
+
+    with pytest.raises(ValueError):
+        cache.get_or_build("key", build)
+    assert cache._building == {}
+    assert cache.stats()["entries"] == 0
+    assert cache.get_or_build("key", lambda: b"pdf") == b"pdf"
@@ -0,0 +1,24 @@
+"""
+Tests for the metrics registry and the metrics the app records
+"""
+
+import app
+from metrics import MetricsRegistry
+
+
+def test_counters_render_in_prometheus_format():
+    registry = MetricsRegistry()
+    registry.inc("quiz_requests_total", source="youtube")
+    registry.inc("quiz_requests_total", 2, source="youtube")
+    assert 'quiz_requests_total{source="youtube"} 3' in registry.render()
+
+
+def test_reported_token_usage_is_counted_by_model_and_kind(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(app, "REGISTRY", registry)
+    app.log_token_usage("deepseek-chat", "prompt", 1000, {"prompt_tokens": 120, "completion_tokens": 80})
+    app.log_token_usage("deepseek-chat", "prompt", 1000, {"prompt_tokens": 30, "completion_tokens": None})
+    app.log_token_usage("deepseek-chat", "prompt", 1000, {})
+    rendered = registry.render()
+    assert 'quiz_llm_tokens_total{kind="prompt",model="deepseek-chat"} 150' in rendered
+    assert 'quiz_llm_tokens_total{kind="completion",model="deepseek-chat"} 80' in rendered
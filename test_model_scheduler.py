@@ -0,0 +1,94 @@
+"""
+Tests for the model scheduler's circuit breakers and retries
+"""
+
+import time
+
+from model_scheduler import AttemptResult, CircuitBreaker, ModelScheduler, parse_retry_after
+
+
+def make_scheduler(reset_timeout=0.05):
+    return ModelScheduler(
+        ["m"],
+        hedge_percentile=0.95,
+        hedge_default_delay=5,
+        max_attempts=1,
+        backoff_base=0.01,
+        backoff_max=0.01,
+        failure_threshold=1,
+        reset_timeout=reset_timeout,
+        deadline=5,
+    )
+
+
+def test_breaker_opens_after_threshold_and_probes_once():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.is_open() and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+
+
+def test_fatal_probe_does_not_leave_breaker_stuck():
+    scheduler = make_scheduler()
+    scheduler.run(lambda model: AttemptResult(error="server error"), hedge=False)
+    time.sleep(0.06)
+
+    result = scheduler.run(lambda model: AttemptResult(error="bad API key", fatal=True), hedge=False)
+    assert result.fatal
+
+    result = scheduler.run(lambda model: AttemptResult(value="quiz"), hedge=False)
+    assert result.value == "quiz"
+
+
+def test_raising_probe_does_not_leave_breaker_stuck():
+    scheduler = make_scheduler()
+    scheduler.run(lambda model: AttemptResult(error="server error"), hedge=False)
+    time.sleep(0.06)
+
+    def broken(model):
+        raise RuntimeError("boom")
+
+    try:
+        scheduler.run(broken, hedge=False)
+    except RuntimeError:
+        pass
+    assert scheduler.run(lambda model: AttemptResult(value="quiz")).value == "quiz"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("not a date") is None
+
+
+def test_abandoned_hedge_stops_retrying_once_another_model_wins():
+    scheduler = ModelScheduler(
+        ["slow", "fast"],
+        hedge_percentile=0.95,
+        hedge_default_delay=0.05,
+        max_attempts=5,
+        backoff_base=0.01,
+        backoff_max=0.01,
+        failure_threshold=10,
+        reset_timeout=60,
+        deadline=5,
+    )
+    calls = {"slow": 0, "fast": 0}
+
+    def attempt(model):
+        calls[model] += 1
+        if model == "fast":
+            return AttemptResult(value="quiz")
+        time.sleep(0.1)
+        return AttemptResult(error="rate limited", retryable=True, retry_after=0.2)
+
+    assert scheduler.run(attempt).value == "quiz"
+    time.sleep(0.5)
+    assert calls == {"slow": 1, "fast": 1}
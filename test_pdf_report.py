@@ -0,0 +1,30 @@
+"""
+Tests for the canvas PDF report
+"""
+
+from PyPDF2 import PdfReader
+
+from pdf_report import build_pdf_report
+
+
+def question(text):
+    return {"question": text, "options": ["a", "b", "c", "d"], "answer": "A"}
+
+
+def test_question_taller_than_a_page_continues_on_the_next():
+    quiz = [question("Short?"), question("word " * 12000), question("Last?")]
+    with build_pdf_report({"quiz": quiz}) as report:
+        pages = [page.extract_text() for page in PdfReader(report).pages]
+    assert len(pages) > 2
+    assert sum(page.count("word") for page in pages) == 12000
+    assert "Question 3" in pages[-1]
+
+
+def test_sections_are_merged_in_order_into_one_valid_pdf():
+    quiz = [question(f"Topic {number}?") for number in range(1, 61)]
+    with build_pdf_report({"quiz": quiz}, section_questions=10) as report:
+        reader = PdfReader(report, strict=True)
+        text = "".join(page.extract_text() for page in reader.pages)
+    assert text.count("AI Quiz Generator Report") == 1
+    positions = [text.index(f"Question {number}: Topic {number}?") for number in range(1, 61)]
+    assert positions == sorted(positions)
@@ -0,0 +1,37 @@
+"""
+Tests for the SQLite question bank
+"""
+
+import os
+import time
+
+from question_bank import QuestionBank
+
+QUESTION = {"question": "What is 2 + 2?", "options": ["1", "2", "3", "4"], "answer": "D"}
+
+
+def test_quiz_is_stored_once_and_searchable(tmp_path):
+    bank = QuestionBank(os.path.join(tmp_path, "bank.db"))
+    assert bank.add_quiz("text", "source", [QUESTION], "hash") is not None
+    assert bank.add_quiz("text", "source", [QUESTION], "hash") is None
+    assert bank.latest_quiz("source")["quiz"] == [QUESTION]
+    assert [result["source_id"] for result in bank.search("what 2")] == ["source"]
+    assert bank.stats() == {"quizzes": 1, "questions": 1}
+
+
+def test_chunk_questions_expire_and_skip_empty_results(tmp_path):
+    bank = QuestionBank(os.path.join(tmp_path, "bank.db"), chunk_ttl_seconds=0.05)
+    bank.add_chunk_questions("a", [QUESTION])
+    bank.add_chunk_questions("b", [])
+    assert bank.chunk_questions(["a", "b"]) == {"a": [QUESTION]}
+    time.sleep(0.06)
+    assert bank.chunk_questions(["a"]) == {}
+    assert bank.prune_chunks() == 1
+
+
+def test_chunks_beyond_the_cap_are_pruned(tmp_path):
+    bank = QuestionBank(os.path.join(tmp_path, "bank.db"), max_chunks=3)
+    for key in "abcde":
+        bank.add_chunk_questions(key, [QUESTION])
+    assert bank.prune_chunks() == 2
+    assert set(bank.chunk_questions(list("abcde"))) == set("cde")
@@ -0,0 +1,16 @@
+"""
+Tests for near-duplicate question elimination
+"""
+
+from question_dedup import QuestionDeduplicator
+
+
+def question(text, answer="Mitochondria"):
+    return {"question": text, "options": [answer, "Nucleus", "Ribosome", "Golgi"], "answer": "A"}
+
+
+def test_reworded_copy_is_rejected_and_distinct_question_kept():
+    deduplicator = QuestionDeduplicator(threshold=0.7)
+    assert deduplicator.add(question("Which organelle produces energy in the cell?"))
+    assert not deduplicator.add(question("Which organelle produces the energy in a cell?"))
+    assert deduplicator.add(question("Where is DNA stored in a eukaryotic cell?", answer="Nucleus"))
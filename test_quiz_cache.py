@@ -0,0 +1,22 @@
+"""
+Tests for the on-disk quiz cache
+"""
+
+from quiz_cache import QuizCache
+
+
+def test_uncounted_get_leaves_hit_and_miss_counters_alone(tmp_path):
+    cache = QuizCache(str(tmp_path), max_bytes=1_000_000, ttl_seconds=60)
+    assert cache.get("missing") is None
+    assert cache.get("missing", count=False) is None
+    cache.set("key", {"quiz": []})
+    assert cache.get("key", count=False) == {"quiz": []}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (0, 1, 1)
+
+
+def test_stats_reuses_the_last_directory_walk(tmp_path, monkeypatch):
+    cache = QuizCache(str(tmp_path), max_bytes=1_000_000, ttl_seconds=60)
+    cache.set("key", {"quiz": []})
+    monkeypatch.setattr(cache, "_entries", lambda: (_ for _ in ()).throw(AssertionError("walked")))
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,44 @@
+"""
+Tests for parsing and salvaging quiz JSON from model output
+"""
+
+import json
+
+from quiz_parser import QuizStreamParser, is_displayable_question, parse_quiz_content
+
+GOOD = {"question": "What is 2 + 2?", "options": ["1", "2", "3", "4"], "answer": "4"}
+BAD = {"question": "a", "options": ["x"]}
+
+
+def test_well_formed_quiz_drops_incomplete_questions():
+    parsed_result, recovered = parse_quiz_content(json.dumps({"quiz": [BAD, GOOD, "text"]}))
+    assert parsed_result == {"quiz": [GOOD]}
+    assert recovered is None
+
+
+def test_truncated_quiz_salvages_only_complete_questions():
+    content = json.dumps({"quiz": [BAD, GOOD, GOOD]})[:-40]
+    parsed_result, recovered = parse_quiz_content(content)
+    assert parsed_result == {"quiz": [GOOD]}
+    assert recovered == 1
+
+
+def test_quiz_without_usable_questions_is_a_failure():
+    assert parse_quiz_content(json.dumps({"quiz": []})) == (None, 0)
+    assert parse_quiz_content(json.dumps({"quiz": [BAD]})) == (None, 0)
+    assert parse_quiz_content("no json here") == (None, 0)
+
+
+def test_stream_parser_emits_questions_as_objects_close():
+    content = json.dumps({"quiz": [GOOD, BAD, GOOD]})
+    parser = QuizStreamParser()
+    emitted = []
+    for start in range(0, len(content), 7):
+        emitted.extend(parser.feed(content[start:start + 7]))
+    assert emitted == [GOOD, GOOD]
+
+
+def test_is_displayable_question():
+    assert is_displayable_question(GOOD)
+    assert not is_displayable_question(BAD)
+    assert not is_displayable_question(["not", "a", "dict"])
@@ -0,0 +1,85 @@
+"""
+Tests for single-flight coalescing, within a process and across processes
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight, fcntl
+
+needs_flock = pytest.mark.skipif(fcntl is None, reason="cross-process coalescing needs fcntl")
+
+
+def test_concurrent_callers_in_one_process_share_one_call():
+    single_flight = SingleFlight()
+    calls = []
+    results = []
+
+    def func():
+        calls.append(1)
+        time.sleep(0.2)
+        return "quiz"
+
+    threads = [threading.Thread(target=lambda: results.append(single_flight.do("key", func))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert results == ["quiz"] * 5
+
+
+def run_worker(lock_dir, work_dir, start_delay, store_result):
+    """One process asking for the same key; func logs its start and end and may store its result"""
+    time.sleep(start_delay)
+    result_path = os.path.join(work_dir, "result")
+
+    def recheck():
+        return "stored" if os.path.exists(result_path) else None
+
+    def func():
+        with open(os.path.join(work_dir, "calls"), "a") as calls:
+            calls.write(f"start {time.monotonic()}\n")
+        time.sleep(0.3)
+        if store_result:
+            with open(result_path, "w") as result:
+                result.write("quiz")
+        with open(os.path.join(work_dir, "calls"), "a") as calls:
+            calls.write(f"end {time.monotonic()}\n")
+        return "quiz"
+
+    SingleFlight(lock_dir, wait_timeout=30).do("key", func, recheck=recheck)
+
+
+def run_workers(tmp_path, store_result, delays):
+    context = multiprocessing.get_context("spawn")
+    lock_dir = str(tmp_path / "locks")
+    os.makedirs(lock_dir)
+    workers = [
+        context.Process(target=run_worker, args=(lock_dir, str(tmp_path), delay, store_result))
+        for delay in delays
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+    with open(tmp_path / "calls") as calls:
+        return [line.split() for line in calls]
+
+
+@needs_flock
+def test_processes_run_func_once_and_find_the_stored_result(tmp_path):
+    events = run_workers(tmp_path, store_result=True, delays=[0, 0.05])
+    assert [event for event, _ in events] == ["start", "end"]
+
+
+@needs_flock
+def test_processes_never_run_func_at_the_same_time(tmp_path):
+    # Nothing is stored, so every process runs func; a late arrival must still wait its turn
+    events = run_workers(tmp_path, store_result=False, delays=[0, 0.05, 0.1, 0.35, 0.4])
+    assert [event for event, _ in events] == ["start", "end"] * 5
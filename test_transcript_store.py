@@ -0,0 +1,21 @@
+"""
+Tests for the SQLite transcript store
+"""
+
+import os
+import time
+
+from transcript_store import TranscriptStore
+
+
+def test_expired_entries_are_hidden_and_purged_on_write(tmp_path):
+    store = TranscriptStore(os.path.join(tmp_path, "transcripts.db"), ttl_seconds=60, negative_ttl_seconds=0.05)
+    store.put_error("old", "en", "TranscriptsDisabled")
+    time.sleep(0.06)
+    assert store.get("old", "en") is None
+
+    # The first write of a store purges, so the expired row is already gone
+    store = TranscriptStore(store.db_path, ttl_seconds=60, negative_ttl_seconds=0.05)
+    store.put_transcript("new", "en", [{"text": "hello"}], "hello")
+    assert store.purge_expired() == 0
+    assert store.get("new", "en")["text"] == "hello"
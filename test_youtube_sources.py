@@ -0,0 +1,100 @@
+"""
+Tests for expanding playlists and channels, with YouTube stubbed out
+"""
+
+from youtube_sources import expand_collection, parse_collection_url
+
+
+class Response:
+    def __init__(self, status_code=200, json_data=None, text="", reason="OK"):
+        self.status_code = status_code
+        self._json = json_data
+        self.text = text
+        self.reason = reason
+
+    def json(self):
+        if self._json is None:
+            raise ValueError("not JSON")
+        return self._json
+
+
+class StubSession:
+    """Answers each GET with the first route whose URL fragment matches, recording every request"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+
+    def get(self, url, timeout=None, params=None, **kwargs):
+        self.requests.append((url, dict(params or {})))
+        for fragment, respond in self.routes:
+            if fragment in url:
+                return respond(params or {})
+        raise AssertionError(f"unexpected request to {url}")
+
+
+def video_id(number):
+    return f"vid{number:08d}"
+
+
+def api_playlist_pages(total):
+    """playlistItems pages of 50 videos, each page linking to the next"""
+    def respond(params):
+        start = int(params.get("pageToken", 0))
+        items = [{"contentDetails": {"videoId": video_id(number)}} for number in range(start, min(start + 50, total))]
+        page = {"items": items}
+        if start + 50 < total:
+            page["nextPageToken"] = str(start + 50)
+        return Response(json_data=page)
+    return respond
+
+
+def playlist_page(video_ids):
+    return lambda params: Response(text="".join(f'{{"videoId":"{vid}"}}' for vid in video_ids))
+
+
+def test_api_listing_stops_paging_at_the_video_cap():
+    session = StubSession([("/playlistItems", api_playlist_pages(1000))])
+    calls = []
+    video_ids, error = expand_collection(("playlist", "PL1"), session, api_key="key", max_videos=120,
+                                         before_request=lambda: calls.append(1))
+    assert error is None
+    assert video_ids == [video_id(number) for number in range(120)]
+    assert len(session.requests) == 3
+    assert len(calls) == 3
+
+
+def test_without_api_key_the_playlist_page_is_read():
+    vids = [video_id(number) for number in range(5)]
+    session = StubSession([("youtube.com/playlist", playlist_page(vids + vids[:2]))])
+    video_ids, error = expand_collection(("playlist", "PL1"), session, max_videos=3)
+    assert error is None
+    assert video_ids == vids[:3]
+    assert all("googleapis" not in url for url, _ in session.requests)
+    assert session.requests[0][1] == {"list": "PL1"}
+
+
+def test_channel_handle_without_api_key_reads_the_uploads_playlist_page():
+    channel_id = "UC" + "a" * 22
+    session = StubSession([
+        ("youtube.com/@teacher", lambda params: Response(text=f'"externalId":"{channel_id}"')),
+        ("youtube.com/playlist", playlist_page([video_id(1)])),
+    ])
+    collection = parse_collection_url("https://www.youtube.com/@teacher")
+    assert expand_collection(collection, session) == ([video_id(1)], None)
+    assert session.requests[-1][1] == {"list": "UU" + "a" * 22}
+
+
+def test_api_errors_are_reported_without_the_api_key():
+    error_page = {"error": {"message": "API key not valid."}}
+    session = StubSession([("/playlistItems", lambda params: Response(403, error_page, reason="Forbidden"))])
+    video_ids, error = expand_collection(("playlist", "PL1"), session, api_key="secret-key")
+    assert video_ids is None
+    assert "HTTP 403: API key not valid." in error
+    assert "secret-key" not in error
+
+
+def test_empty_playlist_is_an_error():
+    session = StubSession([("youtube.com/playlist", playlist_page([]))])
+    video_ids, error = expand_collection(("playlist", "PL1"), session)
+    assert video_ids is None and "No videos found" in error
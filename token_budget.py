@@ -0,0 +1,55 @@
+"""
+Token estimates and prompt packing for quiz generation
+Sizes each chunk of source text from the model's context window and the output
+one request should produce, and sets max_tokens from the number of questions a
+chunk of that length is expected to yield instead of a fixed ceiling.
+"""
+
+import math
+
+
+class TokenBudget:
+    """Packing policy derived from the model limits and the prompt's question density"""
+
+    def __init__(self, context_tokens, max_output_tokens, min_output_tokens, target_output_tokens,
+                 chars_per_token, tokens_per_question, questions_per_1k_input_tokens, prompt_template):
+        self.context_tokens = context_tokens
+        self.max_output_tokens = max_output_tokens
+        self.min_output_tokens = min_output_tokens
+        self.target_output_tokens = target_output_tokens
+        self.chars_per_token = chars_per_token
+        self.tokens_per_question = tokens_per_question
+        self.questions_per_1k_input_tokens = questions_per_1k_input_tokens
+        self.template_tokens = self.estimate(prompt_template)
+
+    def estimate(self, text):
+        """Rough token count of text from its length"""
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def expected_questions(self, input_tokens):
+        return max(1, math.ceil(input_tokens * self.questions_per_1k_input_tokens / 1000))
+
+    def chunk_tokens(self):
+        """Input tokens per request: as much as fits, but no more than the target output can cover"""
+        fits_context = self.context_tokens - self.template_tokens - self.max_output_tokens
+        covered_by_output = self.target_output_tokens / self.tokens_per_question * 1000 / self.questions_per_1k_input_tokens
+        return max(1, int(min(fits_context, covered_by_output)))
+
+    def chunk_chars(self):
+        """chunk_tokens() expressed in characters, for splitting the source text"""
+        return int(self.chunk_tokens() * self.chars_per_token)
+
+    def max_tokens_for(self, chunk_text):
+        """max_tokens for a request on chunk_text: its expected questions plus 25% headroom"""
+        needed = self.expected_questions(self.estimate(chunk_text)) * self.tokens_per_question * 1.25
+        return int(min(self.max_output_tokens, max(self.min_output_tokens, needed)))
+
+    def cache_params(self):
+        """Parameters that change how a source is packed, for cache keys"""
+        return {
+            "context_tokens": self.context_tokens,
+            "max_output_tokens": self.max_output_tokens,
+            "target_output_tokens": self.target_output_tokens,
+            "chars_per_token": self.chars_per_token,
+            "questions_per_1k_input_tokens": self.questions_per_1k_input_tokens,
+        }
@@ -0,0 +1,118 @@
+"""
+SQLite-backed store for YouTube transcripts
+Keeps raw segments, cleaned text and fetch metadata per (video_id, language),
+plus negative results such as disabled captions, so repeat lookups for the same
+video never go back to YouTube until the entry expires.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    segments TEXT,
+    text TEXT,
+    error TEXT,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (video_id, language)
+)
+"""
+
+INDEX = "CREATE INDEX IF NOT EXISTS transcripts_by_expiry ON transcripts (expires_at)"
+
+# Transcripts stored between two purges of expired rows
+PURGE_INTERVAL = 100
+
+
+class TranscriptStore:
+    """Transcript cache with separate TTLs for successful and failed fetches"""
+
+    def __init__(self, db_path, ttl_seconds, negative_ttl_seconds):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._puts = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(SCHEMA)
+            conn.execute(INDEX)
+            conn.commit()
+
+    def _connect(self):
+        # A short-lived connection per call keeps the store safe to use from any thread or process
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get(self, video_id, language):
+        """Return the stored entry for the video, or None if it is missing or expired"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT segments, text, error, fetched_at, expires_at FROM transcripts "
+                "WHERE video_id = ? AND language = ?",
+                (video_id, language),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        segments, text, error, fetched_at, expires_at = row
+        if expires_at < time.time():
+            return None
+
+        return {
+            "segments": json.loads(segments) if segments else None,
+            "text": text,
+            "error": error,
+            "fetched_at": fetched_at,
+        }
+
+    def _put(self, video_id, language, segments, text, error, ttl_seconds):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO transcripts "
+                "(video_id, language, segments, text, error, fetched_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    video_id,
+                    language,
+                    json.dumps(segments, ensure_ascii=False) if segments is not None else None,
+                    text,
+                    error,
+                    now,
+                    now + ttl_seconds,
+                ),
+            )
+            conn.commit()
+
+        # Expired rows are only skipped by get(), so they are deleted every PURGE_INTERVAL writes
+        with self._lock:
+            self._puts += 1
+            due = self._puts % PURGE_INTERVAL == 1
+        if due:
+            self.purge_expired()
+
+    def put_transcript(self, video_id, language, segments, text):
+        """Store a successfully fetched transcript"""
+        self._put(video_id, language, segments, text, None, self.ttl_seconds)
+
+    def put_error(self, video_id, language, error):
+        """Store a failed fetch so it is not retried until the negative TTL runs out"""
+        self._put(video_id, language, None, None, error, self.negative_ttl_seconds)
+
+    def purge_expired(self):
+        """Delete expired entries and return how many were removed"""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute("DELETE FROM transcripts WHERE expires_at < ?", (time.time(),))
+            conn.commit()
+            return cursor.rowcount
@@ -0,0 +1,181 @@
+"""
+YouTube playlists and channels
+Expands playlist and channel URLs to the IDs of their videos and rate-limits
+requests to YouTube with a token bucket shared by every thread in the process.
+With a YouTube Data API key whole playlists and channels are listed; without
+one the public playlist page is read, which shows about the first 100 videos.
+"""
+
+import re
+import threading
+import time
+
+import requests
+
+DATA_API_URL = "https://www.googleapis.com/youtube/v3"
+PAGE_HEADERS = {"Accept-Language": "en-US,en;q=0.9", "User-Agent": "Mozilla/5.0"}
+PAGE_COOKIES = {"CONSENT": "YES+1"}
+PAGE_TIMEOUT = 15
+
+COLLECTION_PATTERNS = [
+    ("playlist", r'youtube\.com\/(?:playlist|watch)?\?(?:.*&)?list=([\w-]+)', "list"),
+    ("channel", r'youtube\.com\/channel\/(UC[\w-]{22})', "id"),
+    ("channel", r'youtube\.com\/(@[\w.-]+)', "handle"),
+    ("channel", r'youtube\.com\/user\/([\w.-]+)', "username"),
+    ("channel", r'youtube\.com\/c\/([\w.-]+)', "custom"),
+]
+
+VIDEO_ID_PATTERN = re.compile(r'"videoId":"([\w-]{11})"')
+# The channel's own ID is in its page metadata as externalId; channelId also appears for other channels
+CHANNEL_ID_PATTERNS = [re.compile(r'"externalId":"(UC[\w-]{22})"'), re.compile(r'"channelId":"(UC[\w-]{22})"')]
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available and take them; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def parse_collection_url(url):
+    """("playlist", list ID) or ("channel", (kind, value)) for playlist and channel URLs, else None
+
+    Watch URLs are left to extract_video_id, including ones that also carry a list= parameter.
+    """
+    if re.search(r'youtube\.com\/watch\?(?:.*&)?v=|youtu\.be\/', url):
+        return None
+    for kind, pattern, ref_kind in COLLECTION_PATTERNS:
+        match = re.search(pattern, url)
+        if match:
+            return (kind, match.group(1)) if kind == "playlist" else (kind, (ref_kind, match.group(1)))
+    return None
+
+
+def uploads_playlist_id(channel_id):
+    """A channel's uploads playlist has the channel ID with UC replaced by UU"""
+    return "UU" + channel_id[2:]
+
+
+class YouTubeRequestError(Exception):
+    """A failed request to YouTube, described without its URL, which can carry the API key"""
+
+
+def describe_error_response(response):
+    """Status code and the Data API's error message (or the HTTP reason) of a failed response"""
+    try:
+        message = response.json()["error"]["message"]
+    except (ValueError, KeyError, TypeError):
+        message = response.reason
+    return f"YouTube returned HTTP {response.status_code}" + (f": {message}" if message else "")
+
+
+def _get(session, url, before_request, **kwargs):
+    if before_request is not None:
+        before_request()
+    try:
+        response = session.get(url, timeout=PAGE_TIMEOUT, **kwargs)
+    except requests.exceptions.RequestException as e:
+        # requests puts the full URL, query string included, into its exception messages
+        raise YouTubeRequestError(f"Could not reach YouTube ({type(e).__name__})") from None
+    if response.status_code >= 400:
+        raise YouTubeRequestError(describe_error_response(response))
+    return response
+
+
+def _unique(video_ids, limit):
+    seen = set()
+    ordered = []
+    for video_id in video_ids:
+        if video_id not in seen:
+            seen.add(video_id)
+            ordered.append(video_id)
+            if len(ordered) >= limit:
+                break
+    return ordered
+
+
+def _playlist_from_api(session, playlist_id, api_key, max_videos, before_request):
+    video_ids = []
+    params = {"part": "contentDetails", "playlistId": playlist_id, "maxResults": 50, "key": api_key}
+    while len(video_ids) < max_videos:
+        page = _get(session, f"{DATA_API_URL}/playlistItems", before_request, params=params).json()
+        video_ids.extend(item["contentDetails"]["videoId"] for item in page.get("items", []))
+        if not page.get("nextPageToken"):
+            break
+        params["pageToken"] = page["nextPageToken"]
+    return _unique(video_ids, max_videos)
+
+
+def _playlist_from_page(session, playlist_id, max_videos, before_request):
+    page = _get(
+        session, "https://www.youtube.com/playlist", before_request,
+        params={"list": playlist_id}, headers=PAGE_HEADERS, cookies=PAGE_COOKIES,
+    )
+    return _unique(VIDEO_ID_PATTERN.findall(page.text), max_videos)
+
+
+def _channel_id(session, channel_ref, api_key, before_request):
+    ref_kind, value = channel_ref
+    if ref_kind == "id":
+        return value
+    if api_key and ref_kind in ("handle", "username"):
+        lookup = {"forHandle": value} if ref_kind == "handle" else {"forUsername": value}
+        page = _get(session, f"{DATA_API_URL}/channels", before_request,
+                    params={"part": "id", "key": api_key, **lookup}).json()
+        if page.get("items"):
+            return page["items"][0]["id"]
+    path = {"handle": value, "username": f"user/{value}", "custom": f"c/{value}"}[ref_kind]
+    page = _get(session, f"https://www.youtube.com/{path}", before_request, headers=PAGE_HEADERS, cookies=PAGE_COOKIES)
+    for pattern in CHANNEL_ID_PATTERNS:
+        match = pattern.search(page.text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def expand_collection(collection, session, api_key=None, max_videos=200, before_request=None):
+    """Video IDs of a parsed playlist or channel in playlist order (newest first for channels); returns (ids, error)
+
+    before_request() is called ahead of every HTTP request, e.g. to wait on a rate limiter.
+    """
+    kind, ref = collection
+    try:
+        if kind == "channel":
+            channel_id = _channel_id(session, ref, api_key, before_request)
+            if channel_id is None:
+                return None, f"Could not find the YouTube channel {ref[1]}."
+            playlist_id = uploads_playlist_id(channel_id)
+        else:
+            playlist_id = ref
+
+        if api_key:
+            video_ids = _playlist_from_api(session, playlist_id, api_key, max_videos, before_request)
+        else:
+            video_ids = _playlist_from_page(session, playlist_id, max_videos, before_request)
+    except YouTubeRequestError as e:
+        return None, f"Could not list the videos of this {kind}: {str(e)}"
+    except (ValueError, KeyError, TypeError):
+        return None, f"Could not list the videos of this {kind}: YouTube returned an unexpected response."
+
+    if not video_ids:
+        return None, f"No videos found in this {kind}. Private playlists and channels cannot be read."
+    return video_ids, None